@@ -176,10 +176,14 @@ class KeyboardLayoutUS:
 
         self.keyboard = keyboard
 
-    def write(self, string):
+    def write(self, string, fast=False):
         """Type the string by pressing and releasing keys on my keyboard.
 
         :param string: A string of ASCII characters.
+        :param bool fast: Send about one report per character instead of two or three.
+            Each report presses the next character's key in place of the last one, a key is
+            only released on its own when the next character uses it again, and SHIFT stays
+            held across runs of shifted characters.
         :raises ValueError: if any of the characters are not ASCII or have no keycode
             (such as some control characters).
 
@@ -187,7 +191,14 @@ class KeyboardLayoutUS:
 
             # Write abc followed by Enter to the keyboard
             layout.write('abc\\n')
+
+            # Write a long string, sending fewer reports
+            layout.write('Hello world\\n', fast=True)
         """
+        if fast:
+            self._write_fast(string)
+            return
+
         for char in string:
             keycode = self._char_to_keycode(char)
             # If this is a shifted char, clear the SHIFT flag and press the SHIFT key.
@@ -197,6 +208,32 @@ class KeyboardLayoutUS:
             self.keyboard.press(keycode)
             self.keyboard.release_all()
 
+    def _write_fast(self, string):
+        """Type the string sending one report per character where possible."""
+        keyboard = self.keyboard
+        report = keyboard.report
+        previous = 0
+        shifted = False
+        for char in string:
+            keycode = self._char_to_keycode(char)
+            shift = bool(keycode & self.SHIFT_FLAG)
+            keycode &= ~self.SHIFT_FLAG
+            if previous:
+                keyboard._remove_keycode_from_report(previous)
+                if keycode == previous:
+                    # The host only sees a second press if the key goes up in between.
+                    keyboard._keyboard_device.send_report(report)
+            if shift != shifted:
+                if shift:
+                    keyboard._add_keycode_to_report(Keycode.SHIFT)
+                else:
+                    keyboard._remove_keycode_from_report(Keycode.SHIFT)
+                shifted = shift
+            keyboard._add_keycode_to_report(keycode)
+            keyboard._keyboard_device.send_report(report)
+            previous = keycode
+        keyboard.release_all()
+
     def keycodes(self, char):
         """Return a tuple of keycodes needed to type the given character.
 
@@ -0,0 +1 @@
+# Shared keypad engine for the Pico RGB Keypad and Keybow macropads
@@ -0,0 +1 @@
+# Board drivers, each one provides scanning and pixels for a keypad Engine
@@ -0,0 +1,98 @@
+import board
+import digitalio
+import adafruit_dotstar
+
+# keypad is only built in to CircuitPython 7 onwards
+try:
+    import keypad
+except ImportError:
+    keypad = None
+
+# Board driver for the Pimoroni Keybow on a Pico 2 Pi adaptor
+# Buttons are wired straight to GPIO, pixels are mapped through pixel_map
+class Keybow:
+    button_count = 12
+
+    # GPIO pin for each button, in button order
+    button_pins = (
+        board.GP14,
+        board.GP17,
+        board.GP16,
+        board.GP12,
+        board.GP18,
+        board.GP11,
+        board.GP10,
+        board.GP26,
+        board.GP9,
+        board.GP27,
+        board.GP8,
+        board.GP7,
+    )
+
+    # Pixel under each button, in button order
+    pixel_map = (8, 4, 0, 9, 5, 1, 10, 6, 2, 11, 7, 3)
+
+    # brightness: pixel brightness, 0 to 1
+    def __init__(self, brightness=0.1):
+        # Bit for each button, so scanning needs no lookups
+        self.button_bits = tuple(1 << key for key in range(self.button_count))
+
+        if keypad:
+            # keypad samples every pin at the same moment in the background and queues changes,
+            # so a scan only has to apply the queued events to the bitmask
+            self.keys = keypad.Keys(self.button_pins, value_when_pressed=False, pull=True, interval=0.001)
+            self.key_event = keypad.Event()
+            self.key_state = 0
+            self.button_states = self.keypad_states
+        else:
+            buttons = []
+            for pin in self.button_pins:
+                button = digitalio.DigitalInOut(pin)
+                button.switch_to_input(pull=digitalio.Pull.UP)
+                buttons.append(button)
+            self.buttons = tuple(buttons)
+            self.button_states = self.gpio_states
+
+        # Define pixels
+        self.pixels = adafruit_dotstar.DotStar(board.GP2, board.GP3, self.button_count, brightness=brightness, auto_write=True)
+
+    # Function to read button states through keypad
+    # Returns a bitmask with a bit set for every button held down
+    def keypad_states(self):
+        keys = self.keys
+        key_event = self.key_event
+
+        # Start again from the real pin states if changes were dropped
+        if keys.events.overflowed:
+            keys.events.clear()
+            keys.reset()
+            self.key_state = 0
+
+        while keys.events.get_into(key_event):
+            if key_event.pressed:
+                self.key_state |= self.button_bits[key_event.key_number]
+            else:
+                self.key_state &= ~self.button_bits[key_event.key_number]
+
+        return self.key_state
+
+    # Function to read button states straight from the pins
+    # Returns a bitmask with a bit set for every button held down
+    def gpio_states(self):
+        state = 0
+        for i in range(self.button_count):
+            if not self.buttons[i].value:
+                state |= self.button_bits[i]
+        return state
+
+    # Buttons are read directly, so there is never a reason to skip a read
+    def button_changed(self):
+        return True
+
+    # Cleanly set pixel colour
+    def set_pixel(self, button, colour):
+        self.pixels[self.pixel_map[button]] = colour
+
+    # Cleanly clear pixel colour
+    def clear_pixel(self, button):
+        self.pixels[self.pixel_map[button]] = (0, 0, 0)
@@ -0,0 +1,77 @@
+import board
+import busio
+import adafruit_dotstar
+
+from adafruit_bus_device.i2c_device import I2CDevice
+from digitalio import DigitalInOut, Direction, Pull
+
+from macropad.ticks import ticks_ms, ticks_add, ticks_diff
+
+# Board driver for the Pimoroni Pico RGB Keypad
+# Buttons are read from a TCA9555 i2c expander, pixels are numbered the same as buttons
+class PicoRGBKeypad:
+    button_count = 16
+
+    # interrupt_pin: optional pin wired to the expander's INT output
+    #   The expander pulls INT low when a button changes and holds it low until it is read,
+    #   so the expander only needs reading when INT is low. Leave as None to read the
+    #   expander every scan
+    # interrupt_fallback: read the expander at least this often (milliseconds) in case an
+    #   interrupt is missed
+    # brightness: pixel brightness, 0 to 1
+    def __init__(self, interrupt_pin=None, interrupt_fallback=1000, brightness=0.1):
+        self.all_buttons = (1 << self.button_count) - 1
+
+        self.cs = DigitalInOut(board.GP17)
+        self.cs.direction = Direction.OUTPUT
+        self.cs.value = 0
+
+        # Define i2c device
+        self.i2c = busio.I2C(board.GP5, board.GP4)
+        self.device = I2CDevice(self.i2c, 0x20)
+
+        # Reused for every expander read so scanning doesn't allocate
+        # Register 0 is input port 0, the expander moves on to input port 1 for the second byte
+        self.scan_command = bytes([0x0])
+        self.scan_result = bytearray(2)
+
+        self.interrupt = None
+        if interrupt_pin is not None:
+            self.interrupt = DigitalInOut(interrupt_pin)
+            self.interrupt.switch_to_input(pull=Pull.UP)
+        self.interrupt_fallback = interrupt_fallback
+        # Due a read straight away
+        self.last_read = ticks_add(ticks_ms(), -interrupt_fallback - 1)
+
+        # Define pixels
+        self.pixels = adafruit_dotstar.DotStar(board.GP18, board.GP19, self.button_count, brightness=brightness, auto_write=True)
+
+    # Function to read button states
+    # Returns a bitmask with a bit set for every button held down
+    def button_states(self):
+        with self.device:
+            self.device.write_then_readinto(self.scan_command, self.scan_result)
+        # Inputs are pulled up, so a pressed button reads as 0
+        return ~(self.scan_result[0] | self.scan_result[1] << 8) & self.all_buttons
+
+    # Function to check whether the expander needs reading
+    # Always True without an interrupt pin, otherwise True when INT is asserted or the
+    # fallback poll is due
+    def button_changed(self):
+        if self.interrupt is None:
+            return True
+
+        now = ticks_ms()
+        if not self.interrupt.value or ticks_diff(now, self.last_read) > self.interrupt_fallback:
+            self.last_read = now
+            return True
+
+        return False
+
+    # Cleanly set pixel colour
+    def set_pixel(self, button, colour):
+        self.pixels[button] = colour
+
+    # Cleanly clear pixel colour
+    def clear_pixel(self, button):
+        self.pixels[button] = (0, 0, 0)
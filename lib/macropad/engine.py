@@ -0,0 +1,358 @@
+import gc
+import time
+
+from macropad.events import Event, EventQueue
+from macropad.keys import Key
+from macropad.tickers import Tickers
+from macropad.timers import Timers
+from macropad.ticks import ticks_ms, ticks_add, ticks_diff
+
+# Button actions, used with Engine.on()
+SETUP = 0
+PRESSED = 1
+RELEASED = 2
+TICK = 3
+
+# Keypad engine shared by every board
+# A board driver provides:
+#   button_count: number of buttons
+#   button_states(): bitmask with a bit set for every button held down, bit n is button n
+#   button_changed(): False when the buttons can't have changed since the last read
+#   set_pixel(button, colour) / clear_pixel(button): set the LED under a button
+class Engine:
+    def __init__(self, board):
+        self.board = board
+        self.button_count = board.button_count
+
+        # Button state storage
+        # setup, current, previous and toggle are bitmasks, bit n is button n
+        self.states = {
+            "setup": 0,
+            "current": 0,
+            "previous": 0,
+            "toggle": 0
+        }
+
+        # Debounce times per button, in milliseconds
+        # press: how long a press must read steady before it counts, 0 reports it straight away
+        # release: how long a release must read steady before it counts
+        # The defaults report presses on the first scan and hold off releases until contact
+        # bounce has settled, setting both above 0 ignores short glitches in either direction
+        self.debounce_press = [0] * self.button_count
+        self.debounce_release = [5] * self.button_count
+
+        self.debounce = {
+            "raw": 0,
+            "state": 0,
+            "time": [0] * self.button_count
+        }
+
+        # Presses and releases found by scanning wait here until they are handled, so a slow
+        # action never loses an edge. Each event carries the time the button actually moved
+        self.events = EventQueue(32)
+        # Most events handled per loop, anything left over waits for the next loop
+        self.events_per_loop = 8
+        # The event being handled, so actions can see when their button moved
+        self.event = Event()
+
+        # Optional LatencyHistogram from macropad.latency, told about every edge handled
+        self.latency = None
+
+        # Behaviour and action handlers for each button, indexed by button
+        self.keys = tuple(Key(i) for i in range(self.button_count))
+
+        # Functions called every loop, buttons' TICK handlers are subscribed here
+        self.tickers = Tickers()
+
+        # Functions called at set times, hold buttons repeat through here
+        self.timers = Timers()
+        # Kept so the same bound method is used to start and cancel repeat timers
+        self.repeat_handler = self.repeat
+
+        # Scan rate, in milliseconds between scans
+        # Scans every scan_fast while buttons are in use, dropping to every scan_slow once
+        # nothing has been pressed for scan_idle milliseconds. The first press goes straight
+        # back to scan_fast
+        self.scan_fast = 1
+        self.scan_slow = 20
+        self.scan_idle = 5000
+        # Set to True to print the scan rate whenever it changes
+        self.report_scan_rate = False
+
+        self.scan = {
+            "interval": self.scan_fast,
+            "busy_time": 0,
+            "next_time": 0
+        }
+
+        # Loop timing, scans are kept on a fixed schedule of scan intervals, sleeping only for
+        # whatever is left after the work. overruns counts loops that finished after the next
+        # scan was due, worst is the longest loop in milliseconds
+        self.timing = {
+            "overruns": 0,
+            "worst": 0,
+            "printed_time": ticks_ms()
+        }
+        # Milliseconds between timing summaries printed over serial, 0 to never print
+        self.report_timing = 0
+
+    # Function to set the handler for one of a button's actions
+    # action: SETUP, PRESSED, RELEASED or TICK
+    # handler: func(button), or None to remove the handler
+    # interval: for TICK, least milliseconds between calls, 0 to call every loop
+    def on(self, button, action, handler, interval=0):
+        actions = self.keys[button].actions
+        if action == TICK:
+            if actions[TICK]:
+                self.tickers.unsubscribe(actions[TICK], button)
+            if handler:
+                self.tickers.subscribe(handler, button, interval)
+        actions[action] = handler
+
+    # Function to check whether a button is currently pressed
+    def pressed(self, button):
+        return bool(self.states["current"] & (1 << button))
+
+    # Function to measure the bytes allocated by the board's button_states() over a number of reads
+    # This should always be 0, anything else means scanning is feeding the garbage collector
+    def scan_allocations(self, reads=100):
+        button_states = self.board.button_states
+        gc.collect()
+        before = gc.mem_free()
+        i = 0
+        while i < reads:
+            button_states()
+            i += 1
+        return before - gc.mem_free()
+
+    # Function to debounce a raw button_states() bitmask
+    # A button only changes state once its raw reading has been steady for its debounce time
+    def debounce_states(self, raw):
+        debounce = self.debounce
+        now = ticks_ms()
+        moved = raw ^ debounce["raw"]
+        debounce["raw"] = raw
+
+        state = debounce["state"]
+        pending = raw ^ state
+        i = 0
+        while pending:
+            if pending & 1:
+                bit = 1 << i
+                if moved & bit:
+                    debounce["time"][i] = now
+                delay = self.debounce_press[i] if raw & bit else self.debounce_release[i]
+                if ticks_diff(now, debounce["time"][i]) >= delay:
+                    state ^= bit
+            pending >>= 1
+            i += 1
+
+        debounce["state"] = state
+        return state
+
+    # Function to scan the board and queue an event for every button that changed
+    def scan_buttons(self):
+        board = self.board
+        debounce = self.debounce
+
+        # The last read is still current if nothing has changed
+        raw = board.button_states() if board.button_changed() else debounce["raw"]
+        previous = debounce["state"]
+        state = self.debounce_states(raw)
+
+        changed = state ^ previous
+        i = 0
+        while changed:
+            if changed & 1:
+                self.events.push(i, state & (1 << i), debounce["time"][i])
+            changed >>= 1
+            i += 1
+
+    # Function to pick the time until the next scan
+    # busy: True while any button is pressed or settling
+    def scan_interval(self, busy):
+        scan = self.scan
+        if busy:
+            scan["busy_time"] = ticks_ms()
+            interval = self.scan_fast
+        elif scan["interval"] == self.scan_slow or ticks_diff(ticks_ms(), scan["busy_time"]) > self.scan_idle:
+            # Once idle stay idle, however long ago busy_time was
+            interval = self.scan_slow
+        else:
+            interval = self.scan_fast
+
+        if interval != scan["interval"]:
+            scan["interval"] = interval
+            if self.report_scan_rate:
+                print("Scan rate", self.scan_rate(), "Hz")
+
+        return interval
+
+    # Function to get the current scan rate in Hz, for diagnostics
+    def scan_rate(self):
+        return 1000 / self.scan["interval"]
+
+    # Function to handle button events for one Key
+    # setup runs the first time a button is handled, pressed and released run on presses and
+    # releases unless the key's toggle or hold changes that. tick is run by tickers
+    def handle_button(self, key):
+        button = key.button
+        setup, pressed, released, tick = key.actions
+        states = self.states
+        bit = key.bit
+        current = states["current"] & bit
+        previous = states["previous"] & bit
+
+        if not states["setup"] & bit:
+            states["setup"] |= bit
+            if setup:
+                setup(button)
+
+        if current and not previous:
+            if key.toggle and not states["toggle"] & bit:
+                states["toggle"] |= bit
+                if pressed:
+                    pressed(button)
+            elif key.toggle:
+                states["toggle"] &= ~bit
+                if released:
+                    released(button)
+            else:
+                if pressed:
+                    pressed(button)
+                    if key.hold:
+                        self.timers.call_later(key.hold_delay, self.repeat_handler, key)
+
+        elif previous and not current:
+            if not key.toggle:
+                if released:
+                    released(button)
+            if key.hold:
+                self.timers.cancel(self.repeat_handler, key)
+
+    # Timer callback that runs a held hold button's pressed function again
+    def repeat(self, key):
+        if self.states["current"] & key.bit:
+            key.actions[PRESSED](key.button)
+            self.timers.call_later(key.hold_delay, self.repeat_handler, key)
+
+    # Function to get the keypad ready to run, call once before handling any events
+    # Button actions are set up beforehand with on()
+    # hold_buttons, toggle_buttons: lists of buttons with that behaviour
+    # hold_delay: milliseconds between repeats for hold buttons
+    def start(self, hold_buttons=(), toggle_buttons=(), hold_delay=200):
+        keys = self.keys
+
+        for i in hold_buttons:
+            keys[i].hold = True
+            keys[i].hold_delay = hold_delay
+        for i in toggle_buttons:
+            keys[i].toggle = True
+
+        # Set up buttons
+        for key in keys:
+            self.handle_button(key)
+
+    # Function to handle queued presses and releases in the order they happened
+    def handle_events(self):
+        states = self.states
+        keys = self.keys
+        handle_button = self.handle_button
+        event = self.event
+        events = self.events
+        latency = self.latency
+
+        n = self.events_per_loop
+        while n and events.get_into(event):
+            bit = 1 << event.button
+            states["previous"] = (states["previous"] & ~bit) | (states["current"] & bit)
+            if event.pressed:
+                states["current"] |= bit
+            else:
+                states["current"] &= ~bit
+            if latency:
+                latency.edge(event.time)
+            handle_button(keys[event.button])
+            n -= 1
+
+        if latency:
+            latency.handled()
+
+        states["previous"] = states["current"]
+
+    # Function to check whether anything is pressed, settling or waiting to be handled
+    def busy(self):
+        return bool(self.debounce["raw"] | self.states["current"] | len(self.events))
+
+    # Function to run the keypad forever
+    # Takes the same arguments as start()
+    def run(self, hold_buttons=(), toggle_buttons=(), hold_delay=200):
+        self.start(hold_buttons, toggle_buttons, hold_delay)
+
+        tickers = self.tickers
+        timers = self.timers
+        latency = self.latency
+        self.scan["next_time"] = ticks_ms()
+
+        while True:
+            start = ticks_ms()
+
+            self.scan_buttons()
+            self.handle_events()
+            timers.run()
+            tickers.run()
+
+            if latency:
+                latency.poll()
+            self.poll_timing()
+
+            end = ticks_ms()
+
+            # Wait for the next scan, or the next timer if that is sooner
+            # debounce_states() takes care of rapid double hits
+            wake = self.next_scan_time(start, end)
+            deadline = timers.next_deadline()
+            if deadline is not None and ticks_diff(deadline, wake) < 0:
+                wake = deadline
+            if ticks_diff(wake, end) > 0:
+                time.sleep(ticks_diff(wake, end) / 1000)
+
+    # Function to finish a loop that ran from start to end and get when the next scan is due
+    # Scans are kept to a fixed schedule so the loop period doesn't drift with the work
+    # done in it. A loop that wakes early for a timer doesn't move the schedule on
+    def next_scan_time(self, start, end):
+        scan = self.scan
+        timing = self.timing
+
+        took = ticks_diff(end, start)
+        if took > timing["worst"]:
+            timing["worst"] = took
+
+        if ticks_diff(start, scan["next_time"]) >= 0:
+            scan["next_time"] = ticks_add(scan["next_time"], self.scan_interval(self.busy()))
+            if ticks_diff(scan["next_time"], end) < 0:
+                # Too late for the next scan, count it and start the schedule again from now
+                timing["overruns"] += 1
+                scan["next_time"] = end
+
+        return scan["next_time"]
+
+    # Function to print loop timing over serial every report_timing milliseconds
+    def poll_timing(self):
+        if not self.report_timing:
+            return
+
+        now = ticks_ms()
+        if ticks_diff(now, self.timing["printed_time"]) >= self.report_timing:
+            self.timing["printed_time"] = now
+            self.print_timing()
+
+    # Function to print loop timing over serial
+    def print_timing(self):
+        print(
+            "Loop: {:.0f}Hz overruns={} worst={}ms".format(
+                self.scan_rate(),
+                self.timing["overruns"],
+                self.timing["worst"]
+            )
+        )
@@ -0,0 +1,58 @@
+# Button event passed out of an EventQueue
+# button: button number
+# pressed: True for a press, False for a release
+# time: ticks_ms() when the button moved
+class Event:
+    def __init__(self):
+        self.button = 0
+        self.pressed = False
+        self.time = 0
+
+# Fixed size ring buffer of timestamped button events
+# Storage is allocated once, so pushing and draining events never allocates.
+# When the buffer is full new events are dropped and counted in overflows
+class EventQueue:
+    def __init__(self, size=32):
+        self.size = size
+        self.buttons = bytearray(size)
+        self.pressed = bytearray(size)
+        self.times = [0] * size
+        self.head = 0
+        self.count = 0
+        self.overflows = 0
+
+    def __len__(self):
+        return self.count
+
+    # Function to add an event to the end of the queue
+    # Returns False if the queue was full and the event was dropped
+    def push(self, button, pressed, time):
+        if self.count == self.size:
+            self.overflows += 1
+            return False
+
+        i = (self.head + self.count) % self.size
+        self.buttons[i] = button
+        self.pressed[i] = 1 if pressed else 0
+        self.times[i] = time
+        self.count += 1
+        return True
+
+    # Function to take the oldest event off the queue
+    # Fills in event and returns True, or returns False if the queue is empty
+    def get_into(self, event):
+        if not self.count:
+            return False
+
+        i = self.head
+        event.button = self.buttons[i]
+        event.pressed = self.pressed[i] == 1
+        event.time = self.times[i]
+        self.head = (i + 1) % self.size
+        self.count -= 1
+        return True
+
+    # Function to drop every queued event
+    def clear(self):
+        self.head = 0
+        self.count = 0
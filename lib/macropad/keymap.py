@@ -0,0 +1,890 @@
+import os
+import struct
+from array import array
+
+from macropad.engine import SETUP, PRESSED, RELEASED
+
+# Kinds of button in a keymap
+# NONE is transparent, the button does whatever the next active layer down has for it
+NONE = 0
+CONSUMER = 1
+SEND = 2
+PRESS = 3
+# Layer buttons, their code is the layer number
+MOMENTARY = 4
+TOGGLE_LAYER = 5
+ONE_SHOT = 6
+# Macro buttons, their codes are a program for macropad.macros
+MACRO = 7
+# Leader buttons, start a leader sequence
+LEADER = 8
+
+# Layer button modes in the keymap source
+LAYER_MODES = {
+    "momentary": MOMENTARY,
+    "toggle": TOGGLE_LAYER,
+    "one_shot": ONE_SHOT
+}
+
+# Behaviour flags for a button in a keymap
+HOLD = 1
+TOGGLE = 2
+
+# Tap-hold options
+PERMISSIVE_HOLD = 1
+HOLD_ON_OTHER_KEY = 2
+RETRO_TAP = 4
+
+# Marks that no tap-hold button is waiting to be decided, or that no combo matched
+NO_BUTTON = 0xFF
+NO_COMBO = 0xFF
+
+# Most buttons in one combo
+COMBO_SIZE = 8
+
+# Marks that no leader sequence is being typed
+NO_NODE = 0xFFFF
+
+# Compiled cache header: magic, version, button count, layer count, combo count, source
+# size, source mtime, hold delay, tapping term, tap-hold options, combo term, length of the
+# code table, length of the combo lists, leader sequence count, leader trie node count,
+# leader timeout
+CACHE_MAGIC = b"KM"
+CACHE_VERSION = 5
+CACHE_HEADER = "<2sBBBBIIHHBHHHHHH"
+
+# Declarative keymap, compiled into byte tables indexed by layer and button
+# The source is a JSON file on the CIRCUITPY drive, for example
+#   {
+#     "hold_delay": 200,
+#     "tapping_term": 200,
+#     "combo_term": 50,
+#     "combos": [
+#       {"buttons": [4, 5], "send": ["LEFT_CONTROL", "Z"], "pressed_colour": [255, 255, 255]}
+#     ],
+#     "leader_timeout": 1000,
+#     "leader_colour": [255, 255, 255],
+#     "sequences": [
+#       {"keys": [4, 5], "macro": ["git status", {"tap": ["ENTER"]}]},
+#       {"keys": [6], "layer": 1, "mode": "toggle"}
+#     ],
+#     "layers": [
+#       {"keys": [
+#         {"button": 0, "layer": 1, "mode": "momentary", "colour": [255, 255, 255]},
+#         {"button": 1, "consumer": "MUTE", "colour": [255, 102, 0], "pressed_colour": [255, 0, 0]},
+#         {"button": 2, "consumer": "VOLUME_DECREMENT", "hold": true, ...},
+#         {"button": 3, "send": ["ESCAPE"], "on_hold": {"press": ["LEFT_CONTROL"]}, ...},
+#         {"button": 12, "press": ["SHIFT"], "toggle": true, ...},
+#         {"button": 14, "leader": true, "colour": [128, 128, 128]},
+#         {"button": 15, "send": ["LEFT_CONTROL", "C"], ...}
+#       ]},
+#       {"keys": [...]}
+#     ]
+#   }
+# A single layer can be given as "keys" without "layers"
+# consumer: a ConsumerControlCode name, sent on press
+# send: Keycode names, pressed and released together on press
+# press: Keycode names, held down until the button is released (or toggled off)
+# layer, mode: turns on layer while held ("momentary"), turns it on or off on each press
+# ("toggle"), or turns it on for the next button pressed ("one_shot")
+# macro: steps played in the background, see macropad.macros.compile_macro(). Pressing the
+# button again while it plays stops it
+# leader: starts a leader sequence, see below
+# hold, toggle: the button's behaviour, as for Engine.start()
+# on_hold: makes the button dual role. A tap does the button's own action, holding it for
+# tapping_term milliseconds does the on_hold action (any of the above) until it's released
+# Layer 0 is always on. A button does what the highest active layer that sets it says, a
+# layer that doesn't mention a button lets the layers below show through
+#
+# Tap-hold options, all set at the top of the keymap
+# tapping_term: milliseconds a dual role button must be held to count as held, default 200
+# permissive_hold: another button pressed and released while a dual role button is held
+# counts as held, even inside tapping_term, default true
+# hold_on_other_key: any other button pressed while a dual role button is held counts as
+# held, default false
+# retro_tap: a dual role button held past tapping_term and released without another
+# button being pressed still does its tap action, default false
+# Buttons pressed while a dual role button is undecided wait until it is decided, so the
+# host sees them in the right order. Other buttons are never delayed
+#
+# combos: sets of buttons that do their own action (any of the above) when pressed together
+# within combo_term milliseconds of the first, default 50. The buttons' own actions are
+# skipped, and the combo's action is released when the first of them is released. Combos
+# apply on every layer. Presses of buttons in a combo wait until the combo is decided, other
+# buttons are never delayed
+#
+# sequences: buttons pressed one after another following a leader button, each doing its own
+# action (any of the above, pressed and released straight away). While a sequence is typed
+# only the buttons that carry it on are lit in leader_colour, anything else gives up. A
+# sequence fires as soon as no longer one could follow, otherwise when no button is pressed
+# for leader_timeout milliseconds, default 1000
+# The sequences are compiled into a trie, node n's child for button b is
+# leader_next[n * button_count + b], so each press is a single lookup
+class Keymap:
+    def __init__(self, button_count):
+        self.button_count = button_count
+        self.layer_count = 0
+        self.hold_delay = 200
+        self.tapping_term = 200
+        self.tap_hold_options = PERMISSIVE_HOLD
+        self.combo_term = 50
+        self.leader_timeout = 1000
+        self.allocate(1, 0, 0, 1, 0, 0)
+
+        # Active layers, bit n is layer n
+        self.layers = 1
+        # One shot layers waiting for the next button press
+        self.one_shot = 0
+        # Layer each button currently resolves to, and the layer it was pressed on so
+        # releasing it undoes the same thing even if the layers changed while held
+        self.resolved = bytearray(button_count)
+        self.held = bytearray(button_count)
+        # Buttons pressed and not yet released, bit n is button n. A press of a button that
+        # is already down is a hold repeat
+        self.down = 0
+        # Buttons with a binding on any layer or in a combo, and buttons in a combo, bit n
+        # is button n
+        self.bound = 0
+        self.combo_keys = 0
+
+        # Dual role button waiting to be decided between tap and hold
+        self.pending = NO_BUTTON
+        # Dual role buttons decided as held, and those of them another button was
+        # pressed during, bit n is button n
+        self.holding = 0
+        self.interrupted = 0
+        # Presses and releases waiting for the pending button to be decided
+        # Each byte is a button, with the top bit set for a press
+        self.deferred = bytearray(8)
+        self.deferred_count = 0
+        self.replaying = bytearray(8)
+        # Kept so the same bound method is used to start and cancel tapping term timers
+        self.timeout_handler = self.tap_hold_timeout
+
+        # Combo buttons pressed since the first, bit n is button n, 0 when no combo is
+        # being looked for. combo_order has them in the order they were pressed
+        self.combo_pressed = 0
+        self.combo_first = 0
+        # Set by combo_find() when a combo with more buttons could still be completed
+        self.combo_wider = False
+        self.combo_order = bytearray(COMBO_SIZE)
+        self.combo_count = 0
+        # Combo each button is held down as part of, plus 1, or 0 if none
+        self.combo_of = bytearray(button_count)
+        # Combos whose action is still pressed, bit n is combo n
+        self.combos_active = 0
+        self.combo_handler = self.combo_timeout
+
+        # Node of the leader trie the sequence typed so far reached, NO_NODE when no
+        # sequence is being typed
+        self.leader_node = NO_NODE
+        # Buttons pressed as part of the sequence and not yet released, bit n is button n
+        self.leader_down = 0
+        self.leader_handler = self.leader_expired
+
+        self.engine = None
+        self.kbd = None
+        self.cc = None
+        self.set_pixel = None
+        # Macro player, only made if the keymap has macros
+        self.macros = None
+        # Bytes of macro text kept compiled into ready to send reports, set before apply(),
+        # 0 to always type macro text a character at a time
+        self.macro_cache = 4096
+        # Snippets store from macropad.snippets for macro snippet steps, set before apply()
+        self.snippets = None
+
+    # Function to allocate the tables for a number of layers, combos, leader sequences and
+    # leader trie nodes
+    # Entry layer * button_count + button is that button on that layer, and the same entry
+    # plus hold_base is its on_hold action. Entry combo_base + n is combo n's action, and
+    # entry leader_base + n is sequence n's action
+    def allocate(self, layer_count, combo_count, sequence_count, node_count, codes_length, combo_lists_length):
+        entries = layer_count * self.button_count * 2 + combo_count + sequence_count
+        self.layer_count = layer_count
+        self.hold_base = layer_count * self.button_count
+        self.combo_base = self.hold_base * 2
+        self.leader_base = self.combo_base + combo_count
+        # Kind of each entry, NONE, CONSUMER, SEND, PRESS or a layer button
+        self.kinds = bytearray(entries)
+        # HOLD and TOGGLE flags for each entry
+        self.flags = bytearray(entries)
+        # Six bytes per entry, colour then pressed colour
+        self.colours = bytearray(entries * 6)
+        # Entry n's codes are codes[offsets[n]:offsets[n + 1]]
+        # Keycodes and layer numbers are a byte each, consumer codes are two bytes, low byte first
+        self.offsets = array("H", [0] * (entries + 1))
+        self.codes = bytearray(codes_length)
+        # Buttons in each combo, bit n is button n
+        self.combo_masks = array("I", [0] * combo_count)
+        # The combos button n is in are combo_lists[combo_offsets[n]:combo_offsets[n + 1]], so
+        # matching only looks at combos that include the first button pressed
+        self.combo_offsets = array("H", [0] * (self.button_count + 1))
+        self.combo_lists = bytearray(combo_lists_length)
+        # Leader trie, node 0 is the leader button. Node n goes to leader_next[n * button_count
+        # + b] when button b is pressed, 0 if b doesn't carry on any sequence. leader_masks[n]
+        # has the buttons that do, bit b is button b, and leader_ends[n] is the sequence ending
+        # at node n plus 1, or 0
+        self.leader_next = array("H", [0] * (node_count * self.button_count))
+        self.leader_masks = array("I", [0] * node_count)
+        self.leader_ends = array("H", [0] * node_count)
+        self.leader_colour = bytearray((255, 255, 255))
+
+    # Function to get every table with its size in bytes, in cache file order
+    def tables(self):
+        entries = len(self.kinds)
+        return (
+            (self.kinds, entries),
+            (self.flags, entries),
+            (self.colours, entries * 6),
+            (self.offsets, (entries + 1) * 2),
+            (self.codes, len(self.codes)),
+            (self.combo_masks, len(self.combo_masks) * 4),
+            (self.combo_offsets, (self.button_count + 1) * 2),
+            (self.combo_lists, len(self.combo_lists)),
+            (self.leader_next, len(self.leader_next) * 2),
+            (self.leader_masks, len(self.leader_masks) * 4),
+            (self.leader_ends, len(self.leader_ends) * 2),
+            (self.leader_colour, 3)
+        )
+
+    # Function to get the buttons any combo uses, bit n is button n
+    def combo_buttons(self):
+        buttons = 0
+        for mask in self.combo_masks:
+            buttons |= mask
+        return buttons
+
+    # Function to get the buttons any leader sequence uses, bit n is button n
+    def leader_buttons(self):
+        buttons = 0
+        for mask in self.leader_masks:
+            buttons |= mask
+        return buttons
+
+    # Function to load a keymap from a JSON file
+    # A compiled copy is kept in cache_path, and used instead of the JSON file while the
+    # file's size and modified time are unchanged, so a normal boot doesn't parse anything.
+    # The drive is only writable from code.py if boot.py remounts it, otherwise the cache
+    # just isn't saved and the JSON file is parsed every boot
+    def load(self, path, cache_path=None):
+        stat = os.stat(path)
+        size = stat[6]
+        mtime = int(stat[8]) & 0xFFFFFFFF
+
+        if cache_path:
+            try:
+                if self.read_cache(cache_path, size, mtime):
+                    return self
+            except (OSError, ValueError):
+                pass
+
+        import json
+        with open(path) as file:
+            self.compile(json.load(file))
+
+        if cache_path:
+            try:
+                self.write_cache(cache_path, size, mtime)
+            except OSError:
+                pass
+
+        return self
+
+    # Function to compile a parsed keymap into the tables
+    def compile(self, source):
+        from adafruit_hid.keycode import Keycode
+        from adafruit_hid.consumer_control_code import ConsumerControlCode
+
+        layers = source.get("layers") or [source]
+        if len(layers) > 8:
+            raise ValueError("Keymap has more than 8 layers")
+        self.hold_delay = source.get("hold_delay", 200)
+        self.tapping_term = source.get("tapping_term", 200)
+        options = 0
+        if source.get("permissive_hold", True):
+            options |= PERMISSIVE_HOLD
+        if source.get("hold_on_other_key", False):
+            options |= HOLD_ON_OTHER_KEY
+        if source.get("retro_tap", False):
+            options |= RETRO_TAP
+        self.tap_hold_options = options
+        self.combo_term = source.get("combo_term", 50)
+        combos = source.get("combos", ())
+        if len(combos) > 254:
+            raise ValueError("Keymap has more than 254 combos")
+
+        n = self.button_count
+        sequences = source.get("sequences", ())
+        self.leader_timeout = source.get("leader_timeout", 1000)
+
+        # Build the leader trie as lists first to count its nodes, each node is its children
+        # by button
+        trie = [{}]
+        ends = [0]
+        for sequence in range(len(sequences)):
+            node = 0
+            for button in sequences[sequence]["keys"]:
+                if not 0 <= button < n:
+                    raise ValueError("No button {}".format(button))
+                if button not in trie[node]:
+                    trie[node][button] = len(trie)
+                    trie.append({})
+                    ends.append(0)
+                node = trie[node][button]
+            if not node or ends[node]:
+                raise ValueError("Sequence {} is empty or repeated".format(sequences[sequence]["keys"]))
+            ends[node] = sequence + 1
+        if len(trie) > 0xFFFF:
+            raise ValueError("Keymap has too many sequences")
+
+        lists = [[] for button in range(n)]
+        for combo in range(len(combos)):
+            buttons = combos[combo]["buttons"]
+            if not 2 <= len(buttons) <= COMBO_SIZE:
+                raise ValueError("Combos need 2 to {} buttons".format(COMBO_SIZE))
+            for button in buttons:
+                if not 0 <= button < n:
+                    raise ValueError("No button {}".format(button))
+                lists[button].append(combo)
+
+        self.allocate(len(layers), len(combos), len(sequences), len(trie), 0, sum(len(combo_list) for combo_list in lists))
+        entries = {}
+        for layer in range(len(layers)):
+            for entry in layers[layer]["keys"]:
+                button = entry["button"]
+                if not 0 <= button < n:
+                    raise ValueError("No button {}".format(button))
+                entries[layer * n + button] = entry
+                if "on_hold" in entry:
+                    entries[self.hold_base + layer * n + button] = entry["on_hold"]
+        for combo in range(len(combos)):
+            entries[self.combo_base + combo] = combos[combo]
+            for button in combos[combo]["buttons"]:
+                self.combo_masks[combo] |= 1 << button
+
+        for node in range(len(trie)):
+            for button, child in trie[node].items():
+                self.leader_next[node * n + button] = child
+                self.leader_masks[node] |= 1 << button
+            self.leader_ends[node] = ends[node]
+        for sequence in range(len(sequences)):
+            entries[self.leader_base + sequence] = sequences[sequence]
+        self.leader_colour[:] = bytes(source.get("leader_colour", (255, 255, 255)))
+
+        j = 0
+        for button in range(n):
+            self.combo_offsets[button] = j
+            for combo in lists[button]:
+                self.combo_lists[j] = combo
+                j += 1
+        self.combo_offsets[n] = j
+
+        codes = bytearray()
+        for i in range(len(self.kinds)):
+            self.offsets[i] = len(codes)
+            kind = NONE
+            flags = 0
+            entry = entries.get(i)
+            if entry:
+                if "consumer" in entry:
+                    kind = CONSUMER
+                    code = getattr(ConsumerControlCode, entry["consumer"])
+                    codes.append(code & 0xFF)
+                    codes.append(code >> 8)
+                elif "send" in entry or "press" in entry:
+                    kind = SEND if "send" in entry else PRESS
+                    for name in entry["send"] if kind == SEND else entry["press"]:
+                        codes.append(getattr(Keycode, name))
+                elif "macro" in entry:
+                    from macropad.macros import compile_macro
+                    kind = MACRO
+                    compile_macro(entry["macro"], codes)
+                elif "leader" in entry:
+                    kind = LEADER
+                elif "layer" in entry:
+                    if not 0 < entry["layer"] < len(layers):
+                        raise ValueError("No layer {}".format(entry["layer"]))
+                    kind = LAYER_MODES[entry.get("mode", "momentary")]
+                    codes.append(entry["layer"])
+                if i < self.hold_base and "on_hold" in entry and not kind:
+                    raise ValueError("Button {} has on_hold but no tap action".format(i % n))
+
+                if entry.get("hold"):
+                    flags |= HOLD
+                if entry.get("toggle"):
+                    flags |= TOGGLE
+
+                colour = entry.get("colour", (0, 0, 0))
+                pressed_colour = entry.get("pressed_colour", colour)
+                self.colours[i * 6:i * 6 + 6] = bytes(tuple(colour) + tuple(pressed_colour))
+
+            self.kinds[i] = kind
+            self.flags[i] = flags
+
+        if len(codes) > 0xFFFF:
+            raise ValueError("Keymap has too many keycodes")
+        self.offsets[len(self.kinds)] = len(codes)
+        self.codes = codes
+
+    # Function to read the tables from a cache file written by write_cache()
+    # Returns False if the cache is for a different source file or button count, or cut short
+    def read_cache(self, path, size, mtime):
+        with open(path, "rb") as file:
+            header = file.read(struct.calcsize(CACHE_HEADER))
+            if len(header) != struct.calcsize(CACHE_HEADER):
+                # Cut short, such as by a power cut while it was being written
+                return False
+            (magic, version, buttons, layer_count, combo_count, cached_size, cached_mtime,
+             hold_delay, tapping_term, options, combo_term, codes_length,
+             combo_lists_length, sequence_count, node_count,
+             leader_timeout) = struct.unpack(CACHE_HEADER, header)
+            if (magic != CACHE_MAGIC or version != CACHE_VERSION or buttons != self.button_count
+                    or cached_size != size or cached_mtime != mtime):
+                return False
+
+            self.allocate(layer_count, combo_count, sequence_count, node_count, codes_length, combo_lists_length)
+            for table, length in self.tables():
+                if length and file.readinto(table) != length:
+                    raise ValueError("Keymap cache is truncated")
+
+        self.hold_delay = hold_delay
+        self.tapping_term = tapping_term
+        self.tap_hold_options = options
+        self.combo_term = combo_term
+        self.leader_timeout = leader_timeout
+        return True
+
+    # Function to save the tables to a cache file
+    def write_cache(self, path, size, mtime):
+        with open(path, "wb") as file:
+            file.write(struct.pack(
+                CACHE_HEADER, CACHE_MAGIC, CACHE_VERSION, self.button_count, self.layer_count,
+                len(self.combo_masks), size, mtime, self.hold_delay, self.tapping_term,
+                self.tap_hold_options, self.combo_term, len(self.codes), len(self.combo_lists),
+                len(self.kinds) - self.leader_base, len(self.leader_ends), self.leader_timeout
+            ))
+            for table, length in self.tables():
+                file.write(table)
+
+    # Function to program every button in the keymap onto an Engine
+    # Buttons the keymap doesn't mention on any layer are left alone for code.py to set up
+    def apply(self, engine, kbd, cc):
+        self.engine = engine
+        self.kbd = kbd
+        self.cc = cc
+        self.set_pixel = engine.board.set_pixel
+        if MACRO in self.kinds:
+            from macropad.macros import Macros
+            cache = None
+            if self.macro_cache:
+                from macropad.report_cache import ReportCache
+                cache = ReportCache(self.codes, self.macro_cache)
+            self.macros = Macros(kbd, cc, engine.timers, cache=cache, snippets=self.snippets)
+            for i in range(len(self.kinds)):
+                if self.kinds[i] == MACRO:
+                    self.macros.preload(self.codes, self.offsets[i], self.offsets[i + 1])
+
+        n = self.button_count
+        self.combo_keys = self.combo_buttons()
+        self.bound = self.combo_keys | self.leader_buttons()
+        for button in range(n):
+            for layer in range(self.layer_count):
+                if self.kinds[layer * n + button]:
+                    self.bound |= 1 << button
+            if not self.bound & (1 << button):
+                continue
+            self.resolved[button] = self.resolve(button)
+            self.update_key(button)
+            engine.on(button, SETUP, self.released)
+            engine.on(button, PRESSED, self.pressed)
+            engine.on(button, RELEASED, self.released)
+
+    # Function to find the highest active layer with a binding for a button
+    # Costs at most one check per layer, whatever the keymap holds
+    def resolve(self, button):
+        n = self.button_count
+        layer = self.layer_count - 1
+        while layer:
+            if self.layers & (1 << layer) and self.kinds[layer * n + button]:
+                return layer
+            layer -= 1
+        return 0
+
+    # Function to change the active layers
+    # Only buttons whose binding changed are looked at again, and only those whose colour
+    # changed are redrawn. Buttons held down keep their pressed colour and behaviour
+    # until they are released
+    def set_layers(self, layers):
+        layers |= 1
+        if layers == self.layers:
+            return
+        self.layers = layers
+
+        n = self.button_count
+        colours = self.colours
+        states = self.engine.states
+        busy = states["current"] | states["toggle"]
+        bound = self.bound
+        button = 0
+        while bound:
+            if bound & 1:
+                old = self.resolved[button]
+                new = self.resolve(button)
+                if new != old:
+                    self.resolved[button] = new
+                    if not busy & (1 << button):
+                        self.update_key(button)
+                        i = (old * n + button) * 6
+                        j = (new * n + button) * 6
+                        if colours[i:i + 3] != colours[j:j + 3]:
+                            self.redraw(button)
+            bound >>= 1
+            button += 1
+
+    # Function to give a button's Key the hold and toggle behaviour of its current binding
+    def update_key(self, button):
+        key = self.engine.keys[button]
+        flags = self.flags[self.resolved[button] * self.button_count + button]
+        key.hold = bool(flags & HOLD)
+        key.toggle = bool(flags & TOGGLE)
+        key.hold_delay = self.hold_delay
+
+    # Function to show a button's current colour, offset 0 for its colour or 3 for its
+    # pressed colour
+    def show(self, button, offset):
+        self.show_colour(button, (self.resolved[button] * self.button_count + button) * 6 + offset)
+
+    # Function to show a button's colour when it isn't pressed, or while a leader sequence
+    # is being typed whether it carries the sequence on
+    def redraw(self, button):
+        if self.leader_node == NO_NODE:
+            self.show(button, 0)
+        elif self.leader_masks[self.leader_node] & (1 << button):
+            colour = self.leader_colour
+            self.set_pixel(button, (colour[0], colour[1], colour[2]))
+        else:
+            self.set_pixel(button, (0, 0, 0))
+
+    # Function to show the colour starting at byte i of colours on a button
+    def show_colour(self, button, i):
+        colours = self.colours
+        self.set_pixel(button, (colours[i], colours[i + 1], colours[i + 2]))
+
+    # Function to do the press half of entry i's action
+    def press_entry(self, i):
+        kind = self.kinds[i]
+        start = self.offsets[i]
+        end = self.offsets[i + 1]
+        codes = self.codes
+
+        if kind == CONSUMER:
+            self.cc.send(codes[start] | codes[start + 1] << 8)
+        elif kind == SEND:
+            # Only its own keys are released, keys other buttons are holding stay down
+            keys = codes[start:end]
+            self.kbd.press(*keys)
+            self.kbd.release(*keys)
+        elif kind == PRESS:
+            self.kbd.press(*codes[start:end])
+        elif kind == MOMENTARY:
+            self.set_layers(self.layers | 1 << codes[start])
+            return
+        elif kind == TOGGLE_LAYER:
+            self.set_layers(self.layers ^ 1 << codes[start])
+            return
+        elif kind == ONE_SHOT:
+            self.one_shot |= 1 << codes[start]
+            self.set_layers(self.layers | 1 << codes[start])
+            return
+        elif kind == MACRO:
+            if not self.macros.cancel(i):
+                self.macros.play(i, codes, start, end)
+        elif kind == LEADER:
+            # One shot layers carry on to the sequence's action
+            self.leader_node = 0
+            self.engine.timers.call_later(self.leader_timeout, self.leader_handler)
+            self.redraw_all()
+            return
+
+        # One shot layers last for one button press
+        if self.one_shot:
+            layers = self.layers & ~self.one_shot
+            self.one_shot = 0
+            self.set_layers(layers)
+
+    # Function to do the release half of entry i's action
+    def release_entry(self, i):
+        kind = self.kinds[i]
+        start = self.offsets[i]
+
+        if kind == PRESS:
+            self.kbd.release(*self.codes[start:self.offsets[i + 1]])
+        elif kind == MOMENTARY:
+            self.set_layers(self.layers & ~(1 << self.codes[start]))
+
+    # PRESSED handler for every button in the keymap
+    def pressed(self, button):
+        if self.pending != NO_BUTTON:
+            self.defer(button | 0x80)
+            if self.tap_hold_options & HOLD_ON_OTHER_KEY:
+                self.decide(True)
+            return
+
+        if self.leader_down & (1 << button):
+            # Held down as part of a leader sequence, e.g. a hold repeat
+            return
+        if self.leader_node != NO_NODE:
+            self.leader_press(button)
+            return
+
+        if self.combo_of[button] or self.combo_pressed & (1 << button):
+            # Held down as part of a combo, or waiting to see if it is one, e.g. a hold repeat
+            return
+        if self.combo_pressed or self.combo_keys & (1 << button):
+            self.combo_press(button)
+            return
+
+        self.press_button(button)
+
+    # Function to handle a press that isn't part of a combo
+    def press_button(self, button):
+        # Any dual role button being held has now been used with another button
+        self.interrupted |= self.holding
+
+        bit = 1 << button
+        if self.down & bit:
+            # A hold repeat, does what the button did when it was first pressed
+            layer = self.held[button]
+        else:
+            layer = self.resolved[button]
+            self.held[button] = layer
+            self.down |= bit
+        i = layer * self.button_count + button
+        self.show(button, 3)
+
+        if self.kinds[self.hold_base + i]:
+            # Dual role, wait to see whether it is a tap or a hold
+            self.pending = button
+            self.engine.timers.call_later(self.tapping_term, self.timeout_handler, button)
+            return
+
+        self.press_entry(i)
+
+    # SETUP and RELEASED handler for every button in the keymap
+    def released(self, button):
+        bit = 1 << button
+        if self.leader_down & bit:
+            # Pressed as part of a leader sequence, which has done all it needs to
+            self.leader_down &= ~bit
+            self.redraw(button)
+            return
+        if self.combo_pressed & bit:
+            # Let go before the combo was complete
+            self.decide_combo()
+        if self.combo_of[button]:
+            combo = self.combo_of[button] - 1
+            self.combo_of[button] = 0
+            if self.combos_active & (1 << combo):
+                # First of the combo's buttons released
+                self.combos_active &= ~(1 << combo)
+                self.release_entry(self.combo_base + combo)
+            self.redraw(button)
+            return
+
+        i = self.held[button] * self.button_count + button
+        if self.pending == button:
+            # Released inside tapping_term, a tap
+            self.decide(False)
+        elif self.pending != NO_BUTTON and self.is_deferred(button | 0x80):
+            # Released while waiting on a dual role button it was pressed after
+            self.defer(button)
+            if self.tap_hold_options & PERMISSIVE_HOLD:
+                self.decide(True)
+            return
+        elif self.holding & bit:
+            self.holding &= ~bit
+            self.release_entry(self.hold_base + i)
+            if self.tap_hold_options & RETRO_TAP and not self.interrupted & bit:
+                self.press_entry(i)
+                self.release_entry(i)
+            self.interrupted &= ~bit
+        else:
+            self.release_entry(i)
+
+        # The button now does whatever its current layer says
+        self.down &= ~bit
+        self.held[button] = self.resolved[button]
+        self.update_key(button)
+        self.redraw(button)
+
+    # Timer callback for a dual role button held for tapping_term
+    def tap_hold_timeout(self, button):
+        if self.pending == button:
+            self.decide(True)
+
+    # Function to decide the pending dual role button as a hold or a tap, then handle any
+    # presses and releases that were waiting on it. A tap is pressed and released before
+    # them, as the button was released first
+    def decide(self, hold):
+        button = self.pending
+        self.pending = NO_BUTTON
+        self.engine.timers.cancel(self.timeout_handler, button)
+
+        i = self.held[button] * self.button_count + button
+        if hold:
+            self.holding |= 1 << button
+            self.interrupted &= ~(1 << button)
+            self.press_entry(self.hold_base + i)
+        else:
+            self.press_entry(i)
+            self.release_entry(i)
+
+        # Swap buffers so anything deferred again while replaying isn't lost
+        replaying = self.deferred
+        count = self.deferred_count
+        self.deferred = self.replaying
+        self.replaying = replaying
+        self.deferred_count = 0
+        j = 0
+        while j < count:
+            event = replaying[j]
+            if event & 0x80:
+                self.pressed(event & 0x7F)
+            else:
+                self.released(event)
+            j += 1
+
+    # Function to hold back a press (button | 0x80) or release until the pending dual role
+    # button is decided. If too many are waiting it is decided as a hold straight away
+    def defer(self, event):
+        if self.deferred_count == len(self.deferred):
+            self.decide(True)
+            if event & 0x80:
+                self.pressed(event & 0x7F)
+            else:
+                self.released(event)
+            return
+
+        self.deferred[self.deferred_count] = event
+        self.deferred_count += 1
+
+    # Function to check whether a press or release is waiting on the pending button
+    def is_deferred(self, event):
+        for j in range(self.deferred_count):
+            if self.deferred[j] == event:
+                return True
+        return False
+
+    # Function to handle a press while looking for combos
+    def combo_press(self, button):
+        pressed = self.combo_pressed | (1 << button)
+        if not self.combo_pressed:
+            self.combo_first = button
+            self.combo_count = 0
+            self.engine.timers.call_later(self.combo_term, self.combo_handler)
+
+        combo = self.combo_find(pressed)
+        if combo == NO_COMBO and not self.combo_wider:
+            # No combo has all of these, settle the buttons so far then handle this one
+            self.decide_combo()
+            self.pressed(button)
+            return
+
+        self.combo_pressed = pressed
+        self.combo_order[self.combo_count] = button
+        self.combo_count += 1
+        if not self.combo_wider:
+            self.decide_combo()
+
+    # Function to find the combo with exactly the buttons in pressed, or NO_COMBO
+    # Sets combo_wider if a combo with more buttons includes all of them. Only the combos the
+    # first button pressed is in are looked at
+    def combo_find(self, pressed):
+        masks = self.combo_masks
+        lists = self.combo_lists
+        found = NO_COMBO
+        wider = False
+        j = self.combo_offsets[self.combo_first]
+        end = self.combo_offsets[self.combo_first + 1]
+        while j < end:
+            mask = masks[lists[j]]
+            if mask == pressed:
+                found = lists[j]
+            elif mask & pressed == pressed:
+                wider = True
+            j += 1
+        self.combo_wider = wider
+        return found
+
+    # Timer callback for combo_term running out
+    def combo_timeout(self, arg):
+        if self.combo_pressed:
+            self.decide_combo()
+
+    # Function to stop looking for a combo, firing the one pressed if there is one or handling
+    # the buttons pressed as normal presses if not
+    def decide_combo(self):
+        self.engine.timers.cancel(self.combo_handler)
+        combo = self.combo_find(self.combo_pressed)
+        self.combo_pressed = 0
+
+        order = self.combo_order
+        if combo != NO_COMBO:
+            self.combos_active |= 1 << combo
+            colour = (self.combo_base + combo) * 6 + 3
+            for j in range(self.combo_count):
+                self.combo_of[order[j]] = combo + 1
+                self.show_colour(order[j], colour)
+            self.press_entry(self.combo_base + combo)
+            return
+
+        for j in range(self.combo_count):
+            if self.pending != NO_BUTTON:
+                self.defer(order[j] | 0x80)
+            else:
+                self.press_button(order[j])
+
+    # Function to handle a press while a leader sequence is being typed
+    def leader_press(self, button):
+        self.leader_down |= 1 << button
+        self.show(button, 3)
+        node = self.leader_next[self.leader_node * self.button_count + button]
+        if not node:
+            # Doesn't carry on any sequence, give up
+            self.end_leader(0)
+        elif not self.leader_masks[node]:
+            # No longer sequence starts with this one
+            self.end_leader(self.leader_ends[node])
+        else:
+            self.leader_node = node
+            self.engine.timers.cancel(self.leader_handler)
+            self.engine.timers.call_later(self.leader_timeout, self.leader_handler)
+            self.redraw_all()
+
+    # Timer callback for leader_timeout passing without a press
+    def leader_expired(self, arg):
+        if self.leader_node != NO_NODE:
+            self.end_leader(self.leader_ends[self.leader_node])
+
+    # Function to stop typing a leader sequence, then do sequence number - 1's action, or
+    # nothing if sequence is 0
+    def end_leader(self, sequence):
+        self.leader_node = NO_NODE
+        self.engine.timers.cancel(self.leader_handler)
+        self.redraw_all()
+        if sequence:
+            i = self.leader_base + sequence - 1
+            self.press_entry(i)
+            self.release_entry(i)
+
+    # Function to redraw every button in the keymap that isn't held down
+    def redraw_all(self):
+        states = self.engine.states
+        bound = self.bound & ~(states["current"] | states["toggle"])
+        button = 0
+        while bound:
+            if bound & 1:
+                self.redraw(button)
+            bound >>= 1
+            button += 1
@@ -0,0 +1,16 @@
+# Compiled behaviour for one button, built once at boot so handling a button needs no
+# list searches or new closures
+# toggle: True or False, turns the button into a toggle on / off, will run pressed when on, and released when off
+# hold: True or False, repeatedly runs the pressed function when held down, and runs released when released
+# hold_delay: milliseconds, time between executions of the pressed function when held
+# actions: handler for each of SETUP, PRESSED, RELEASED and TICK, func(button) or None
+class Key:
+    __slots__ = ("button", "bit", "toggle", "hold", "hold_delay", "actions")
+
+    def __init__(self, button):
+        self.button = button
+        self.bit = 1 << button
+        self.toggle = False
+        self.hold = False
+        self.hold_delay = 0
+        self.actions = [None, None, None, None]
@@ -0,0 +1,121 @@
+from macropad.ticks import ticks_ms, ticks_diff
+
+# Press to report latency histogram
+# The engine stamps each button edge it handles with edge(), and HID devices wrapped with
+# wrap() stamp each report they send. The time from an edge to the first report it causes
+# is counted into fixed width buckets, so recording is a subtraction and a list increment
+# and the memory used never grows.
+# Times are whole milliseconds from ticks_ms()
+# buckets: number of buckets, the last one also counts anything slower
+# bucket_width: milliseconds covered by each bucket
+# print_interval: milliseconds between summaries printed by poll(), 0 to never print
+class LatencyHistogram:
+    def __init__(self, buckets=100, bucket_width=1, print_interval=30000):
+        self.buckets = buckets
+        self.bucket_width = bucket_width
+        self.print_interval = print_interval
+        self.counts = [0] * buckets
+        self.pending = None
+        self.printed_time = ticks_ms()
+        self.reset()
+
+    # Function to forget every sample
+    def reset(self):
+        for i in range(self.buckets):
+            self.counts[i] = 0
+        self.count = 0
+        self.min = None
+        self.max = None
+        self.printed_count = 0
+
+    # Function to mark that a button moved at edge_time and is about to be handled
+    def edge(self, edge_time):
+        self.pending = edge_time
+
+    # Function to mark that the edges since edge() are handled
+    # An edge that sent nothing is dropped so a later, unrelated report isn't counted
+    def handled(self):
+        self.pending = None
+
+    # Function to record a report leaving for the host
+    def report(self):
+        if self.pending is None:
+            return
+
+        latency = ticks_diff(ticks_ms(), self.pending)
+        self.pending = None
+
+        bucket = latency // self.bucket_width
+        if bucket >= self.buckets:
+            bucket = self.buckets - 1
+        self.counts[bucket] += 1
+        self.count += 1
+        if self.min is None or latency < self.min:
+            self.min = latency
+        if self.max is None or latency > self.max:
+            self.max = latency
+
+    # Function to estimate a percentile (0 to 100) in milliseconds
+    # Accurate to one bucket width, returns the top edge of the bucket it falls in, or the
+    # slowest sample if that is lower
+    def percentile(self, percent):
+        if not self.count:
+            return None
+
+        target = self.count * percent / 100
+        total = 0
+        for i in range(self.buckets):
+            total += self.counts[i]
+            if total >= target:
+                return min((i + 1) * self.bucket_width, self.max)
+        return self.max
+
+    # Function to print a summary of the samples so far over serial, in milliseconds
+    def print_summary(self):
+        if not self.count:
+            print("Latency: no samples")
+            return
+
+        print(
+            "Latency: n={} min={}ms p50={}ms p99={}ms max={}ms".format(
+                self.count,
+                self.min,
+                self.percentile(50),
+                self.percentile(99),
+                self.max
+            )
+        )
+
+    # Function to print a summary every print_interval milliseconds, if there are new samples
+    def poll(self):
+        if not self.print_interval:
+            return
+
+        now = ticks_ms()
+        if ticks_diff(now, self.printed_time) < self.print_interval:
+            return
+
+        self.printed_time = now
+        if self.count != self.printed_count:
+            self.printed_count = self.count
+            self.print_summary()
+
+    # Function to wrap HID devices so every report they send is stamped
+    # Pass the result to Keyboard and ConsumerControl in place of usb_hid.devices
+    def wrap(self, devices):
+        return [ReportTimer(device, self) for device in devices]
+
+# HID device wrapper that tells a LatencyHistogram whenever a report is sent
+class ReportTimer:
+    def __init__(self, device, histogram):
+        self.device = device
+        self.histogram = histogram
+        self.usage_page = device.usage_page
+        self.usage = device.usage
+
+    def send_report(self, report, report_id=None):
+        if report_id is None:
+            self.device.send_report(report)
+        else:
+            self.device.send_report(report, report_id)
+        self.histogram.report()
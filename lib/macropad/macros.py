@@ -0,0 +1,354 @@
+from array import array
+
+from adafruit_hid.keycode import Keycode
+from adafruit_hid.keyboard_layout_us import KeyboardLayoutUS
+
+from macropad.ticks import ticks_ms, ticks_add, ticks_diff
+
+# Macro program steps, each an op byte followed by its arguments
+# TEXT: length (2 bytes, low byte first), then that many ASCII characters to type
+# TAP: count, then count keycodes pressed together and released
+# PRESS, RELEASE: count, then count keycodes to press or release
+# CONSUMER: consumer control code (2 bytes, low byte first), sent
+# DELAY: milliseconds (2 bytes, low byte first) to wait before the next step
+# SNIPPET: name length, then the name of a snippet in the Macros' Snippets store to type
+TEXT = 1
+TAP = 2
+PRESS = 3
+RELEASE = 4
+CONSUMER = 5
+DELAY = 6
+SNIPPET = 7
+
+# Keys a macro can hold down at once with PRESS
+HELD_SIZE = 6
+
+# Marks a player slot that isn't playing anything
+FREE = 0xFFFF
+
+# Marks that no slot is typing
+NO_SLOT = 0xFF
+
+ASCII_TO_KEYCODE = KeyboardLayoutUS.ASCII_TO_KEYCODE
+SHIFT_FLAG = KeyboardLayoutUS.SHIFT_FLAG
+
+# Function to compile macro steps from a keymap into a program, appended to codes
+# Each step is one of
+#   "some text": typed as on a US keyboard
+#   {"tap": ["LEFT_CONTROL", "C"]}: Keycode names pressed together and released
+#   {"press": ["SHIFT"]}, {"release": ["SHIFT"]}: Keycode names pressed or released
+#   {"consumer": "MUTE"}: a ConsumerControlCode name
+#   {"delay": 100}: milliseconds to wait
+#   {"snippet": "signature"}: a snippet from a macropad.snippets store, typed as it is read
+def compile_macro(steps, codes):
+    from adafruit_hid.consumer_control_code import ConsumerControlCode
+
+    for step in steps:
+        if isinstance(step, str):
+            for start in range(0, len(step), 0xFFFF):
+                text = step[start:start + 0xFFFF]
+                codes.append(TEXT)
+                codes.append(len(text) & 0xFF)
+                codes.append(len(text) >> 8)
+                for char in text:
+                    if ord(char) > 127 or not ASCII_TO_KEYCODE[ord(char)]:
+                        raise ValueError("Can't type {!r}".format(char))
+                    codes.append(ord(char))
+        elif "tap" in step or "press" in step or "release" in step:
+            for op, name in ((TAP, "tap"), (PRESS, "press"), (RELEASE, "release")):
+                if name in step:
+                    break
+            codes.append(op)
+            codes.append(len(step[name]))
+            for keycode in step[name]:
+                codes.append(getattr(Keycode, keycode))
+        elif "consumer" in step:
+            code = getattr(ConsumerControlCode, step["consumer"])
+            codes.append(CONSUMER)
+            codes.append(code & 0xFF)
+            codes.append(code >> 8)
+        elif "delay" in step:
+            codes.append(DELAY)
+            codes.append(step["delay"] & 0xFF)
+            codes.append(step["delay"] >> 8)
+        elif "snippet" in step:
+            name = step["snippet"].encode()
+            codes.append(SNIPPET)
+            codes.append(len(name))
+            codes.extend(name)
+        else:
+            raise ValueError("Unknown macro step {}".format(step))
+
+# Plays macro programs a few reports at a time, so the keypad keeps scanning and the
+# LEDs keep updating while a long macro types
+# Up to slots macros play at once, each has an owner number (below 0xFFFF) that identifies
+# it, such as the keymap entry that started it. All storage is allocated here, playing a
+# macro only reads its program where it already is
+# Only one macro types at a time, so their keys never mix. The first to reach a text, snippet
+# or key step keeps the keyboard until it finishes, the others carry on with their delays
+# and consumer control steps and wait at their next keyboard step
+# timers: the Engine's Timers, used to step the macros every interval milliseconds
+# reports_per_step: most HID reports each macro sends per step
+# cache: optional ReportCache from macropad.report_cache for the program macros are played
+# from. Text found there is sent as ready made reports, with no work per character, as long
+# as the macro isn't holding any keys down when the text starts
+# snippets: optional Snippets store from macropad.snippets for SNIPPET steps. Each slot
+# has its own chunk buffer, so a snippet of any length is typed in the same memory
+class Macros:
+    def __init__(self, kbd, cc, timers, slots=4, reports_per_step=2, interval=1, cache=None, snippets=None):
+        self.kbd = kbd
+        # Keyboard doesn't give out its device, compiled reports are sent straight to it
+        self.device = kbd._keyboard_device
+        self.cc = cc
+        self.cache = cache
+        self.snippets = snippets
+        self.timers = timers
+        self.slots = slots
+        self.reports_per_step = reports_per_step
+        self.interval = interval
+
+        self.owners = array("H", [FREE] * slots)
+        self.programs = [None] * slots
+        self.positions = array("H", [0] * slots)
+        self.ends = array("H", [0] * slots)
+        # End of the TEXT step being typed, or 0
+        self.text_ends = array("H", [0] * slots)
+        self.wakes = [0] * slots
+        # Compiled text reports each slot is sending, and how far through them it is
+        self.streams = [None] * slots
+        self.stream_positions = [0] * slots
+        # Snippet each slot is reading, the chunk of it being typed and how far through that
+        self.readers = [None] * slots
+        self.chunks = [None] * slots
+        self.chunk_positions = [0] * slots
+        self.chunk_buffers = None
+        if snippets:
+            self.chunk_buffers = [bytearray(snippets.chunk_size) for slot in range(slots)]
+        # Keys each slot has pressed and not released, 0 for none
+        self.held = bytearray(slots * HELD_SIZE)
+        # Slot whose macro has the keyboard, or NO_SLOT
+        self.typing = NO_SLOT
+        self.running = False
+        # Kept so the same bound method is used to start and cancel the step timer
+        self.step_handler = self.step
+
+    # Function to find the slot an owner's macro is playing in, None if it isn't playing
+    def find(self, owner):
+        for slot in range(self.slots):
+            if self.owners[slot] == owner:
+                return slot
+        return None
+
+    # Function to start playing program[start:end] for an owner
+    # Returns False if every slot is busy and the macro wasn't started
+    def play(self, owner, program, start, end):
+        slot = self.find(FREE)
+        if slot is None:
+            return False
+
+        self.owners[slot] = owner
+        self.programs[slot] = program
+        self.positions[slot] = start
+        self.ends[slot] = end
+        self.text_ends[slot] = 0
+        self.wakes[slot] = ticks_ms()
+        if not self.running:
+            self.running = True
+            self.timers.call_every(self.interval, self.step_handler)
+        return True
+
+    # Function to stop an owner's macro, releasing any keys it is holding
+    # Returns False if it wasn't playing
+    def cancel(self, owner):
+        slot = self.find(owner)
+        if slot is None:
+            return False
+        self.finish(slot)
+        return True
+
+    # Function to compile the text in a program ahead of time, so it is ready in the cache
+    # before its macro first plays
+    def preload(self, program, start, end):
+        if not self.cache or program is not self.cache.program:
+            return
+
+        pos = start
+        while pos < end:
+            op = program[pos]
+            if op == TEXT:
+                text_end = pos + 3 + (program[pos + 1] | program[pos + 2] << 8)
+                self.cache.get(pos + 3, text_end)
+                pos = text_end
+            elif op == TAP or op == PRESS or op == RELEASE or op == SNIPPET:
+                pos += 2 + program[pos + 1]
+            else:
+                pos += 3
+
+    # Function to free a slot, releasing any keys its macro is holding
+    def finish(self, slot):
+        if self.streams[slot] is not None:
+            # Back to what the Keyboard has pressed
+            self.streams[slot] = None
+            self.device.send_report(self.kbd.report)
+        if self.readers[slot] is not None:
+            # Closes the snippet store
+            self.readers[slot].close()
+            self.readers[slot] = None
+            self.chunks[slot] = None
+        held = self.held
+        for i in range(slot * HELD_SIZE, slot * HELD_SIZE + HELD_SIZE):
+            if held[i]:
+                self.kbd.release(held[i])
+                held[i] = 0
+        if self.typing == slot:
+            self.typing = NO_SLOT
+        self.owners[slot] = FREE
+        self.programs[slot] = None
+
+    # Timer callback that moves every playing macro on
+    def step(self, arg=None):
+        now = ticks_ms()
+        playing = False
+        for slot in range(self.slots):
+            if self.owners[slot] == FREE:
+                continue
+            if ticks_diff(now, self.wakes[slot]) >= 0:
+                self.step_slot(slot, now)
+            playing = playing or self.owners[slot] != FREE
+
+        if not playing:
+            self.running = False
+            self.timers.cancel(self.step_handler)
+
+    # Function to play up to reports_per_step reports of one slot's macro
+    def step_slot(self, slot, now):
+        kbd = self.kbd
+        program = self.programs[slot]
+        pos = self.positions[slot]
+        end = self.ends[slot]
+        text_end = self.text_ends[slot]
+        stream = self.streams[slot]
+        stream_pos = self.stream_positions[slot]
+        reader = self.readers[slot]
+        chunk = self.chunks[slot]
+        chunk_pos = self.chunk_positions[slot]
+        reports = 0
+
+        while reports < self.reports_per_step:
+            if stream is not None:
+                if stream_pos < len(stream):
+                    self.device.send_report(stream[stream_pos:stream_pos + 8])
+                    stream_pos += 8
+                else:
+                    # Release the last key, back to what the Keyboard has pressed
+                    stream = None
+                    self.device.send_report(kbd.report)
+                reports += 1
+                continue
+
+            if reader is not None:
+                if chunk is not None and chunk_pos < len(chunk):
+                    reports += self.type_char(chunk[chunk_pos])
+                    chunk_pos += 1
+                    continue
+                try:
+                    chunk = next(reader)
+                    chunk_pos = 0
+                except StopIteration:
+                    reader = None
+                    chunk = None
+                continue
+
+            if pos < text_end:
+                reports += self.type_char(program[pos])
+                pos += 1
+                continue
+
+            if pos >= end:
+                self.streams[slot] = None
+                self.readers[slot] = None
+                self.finish(slot)
+                return
+
+            op = program[pos]
+            if op != CONSUMER and op != DELAY and self.typing != slot:
+                if self.typing != NO_SLOT:
+                    # Another macro is typing, wait for it to finish
+                    break
+                self.typing = slot
+            if op == TEXT:
+                text_end = pos + 3 + (program[pos + 1] | program[pos + 2] << 8)
+                pos += 3
+                if self.cache and program is self.cache.program and not any(kbd.report):
+                    reports_buffer = self.cache.get(pos, text_end)
+                    if reports_buffer:
+                        stream = memoryview(reports_buffer)
+                        stream_pos = 0
+                        pos = text_end
+            elif op == TAP or op == PRESS or op == RELEASE:
+                count = program[pos + 1]
+                keycodes = program[pos + 2:pos + 2 + count]
+                pos += 2 + count
+                if op != RELEASE:
+                    kbd.press(*keycodes)
+                    reports += 1
+                if op != PRESS:
+                    kbd.release(*keycodes)
+                    reports += 1
+                if op != TAP:
+                    self.track(slot, keycodes, op == PRESS)
+            elif op == CONSUMER:
+                self.cc.send(program[pos + 1] | program[pos + 2] << 8)
+                pos += 3
+                reports += 2
+            elif op == DELAY:
+                self.wakes[slot] = ticks_add(now, program[pos + 1] | program[pos + 2] << 8)
+                pos += 3
+                break
+            elif op == SNIPPET:
+                name = bytes(program[pos + 2:pos + 2 + program[pos + 1]])
+                pos += 2 + program[pos + 1]
+                i = self.snippets.find(name) if self.snippets else None
+                if i is None:
+                    print("No snippet", name)
+                else:
+                    reader = self.snippets.read(i, self.chunk_buffers[slot])
+                    chunk = None
+            else:
+                raise ValueError("Bad macro step {}".format(op))
+
+        self.positions[slot] = pos
+        self.text_ends[slot] = text_end
+        self.streams[slot] = stream
+        self.stream_positions[slot] = stream_pos
+        self.readers[slot] = reader
+        self.chunks[slot] = chunk
+        self.chunk_positions[slot] = chunk_pos
+
+    # Function to type one ASCII character, returns the reports sent
+    # Characters with no key, such as the \r of a \r\n newline, are skipped
+    def type_char(self, char):
+        keycode = ASCII_TO_KEYCODE[char] if char < 128 else 0
+        if not keycode:
+            return 0
+
+        kbd = self.kbd
+        if keycode & SHIFT_FLAG:
+            keycode &= ~SHIFT_FLAG
+            kbd.press(Keycode.SHIFT, keycode)
+            kbd.release(Keycode.SHIFT, keycode)
+        else:
+            kbd.press(keycode)
+            kbd.release(keycode)
+        return 2
+
+    # Function to note keys a slot's macro pressed or released, so they can be released if
+    # it is cancelled
+    def track(self, slot, keycodes, pressed):
+        held = self.held
+        base = slot * HELD_SIZE
+        for keycode in keycodes:
+            for i in range(base, base + HELD_SIZE):
+                if held[i] == (0 if pressed else keycode):
+                    held[i] = keycode if pressed else 0
+                    break
@@ -0,0 +1,110 @@
+from adafruit_hid.keycode import Keycode
+from adafruit_hid.keyboard_layout_us import KeyboardLayoutUS
+
+ASCII_TO_KEYCODE = KeyboardLayoutUS.ASCII_TO_KEYCODE
+SHIFT_FLAG = KeyboardLayoutUS.SHIFT_FLAG
+SHIFT_BIT = Keycode.modifier_bit(Keycode.SHIFT)
+
+# Function to count the keyboard reports compile_text() makes for program[start:end]
+def count_reports(program, start, end):
+    count = 0
+    previous = 0
+    for i in range(start, end):
+        keycode = ASCII_TO_KEYCODE[program[i]] & ~SHIFT_FLAG
+        if keycode == previous:
+            count += 1
+        count += 1
+        previous = keycode
+    return count
+
+# Function to compile the ASCII text in program[start:end] into ready to send 8 byte
+# keyboard reports, planned like KeyboardLayoutUS.write(fast=True). Each report presses the
+# next character's key in place of the last, a key is only released on its own when the next
+# character uses it again, and SHIFT stays held across shifted runs. The final release isn't
+# included, send the Keyboard's own report after the last one
+def compile_text(program, start, end):
+    reports = bytearray(count_reports(program, start, end) * 8)
+    j = 0
+    previous = 0
+    modifier = 0
+    for i in range(start, end):
+        keycode = ASCII_TO_KEYCODE[program[i]]
+        if keycode & ~SHIFT_FLAG == previous:
+            # Release between two presses of the same key, keeping SHIFT as it was
+            reports[j] = modifier
+            j += 8
+        modifier = SHIFT_BIT if keycode & SHIFT_FLAG else 0
+        previous = keycode & ~SHIFT_FLAG
+        reports[j] = modifier
+        reports[j + 2] = previous
+        j += 8
+    return reports
+
+# Least recently used cache of text compiled into keyboard reports
+# Text is identified by where it starts in program, which is expected not to change, such as
+# a Keymap's code table. At most size texts are kept, using at most budget bytes between
+# them, the least recently used are dropped to make room. Text that compiles to more than
+# budget bytes is never cached
+class ReportCache:
+    def __init__(self, program, budget=4096, size=16):
+        self.program = program
+        self.budget = budget
+        self.size = size
+        self.starts = [None] * size
+        self.buffers = [None] * size
+        self.used_times = [0] * size
+        self.clock = 0
+        # Bytes of reports held, and counts for diagnostics
+        self.used = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # Function to get the reports for the text in program[start:end], compiling them if
+    # they aren't cached. Returns None if they would be bigger than the whole budget
+    def get(self, start, end):
+        self.clock += 1
+        for i in range(self.size):
+            if self.starts[i] == start:
+                self.hits += 1
+                self.used_times[i] = self.clock
+                return self.buffers[i]
+
+        self.misses += 1
+        length = count_reports(self.program, start, end) * 8
+        if length > self.budget:
+            return None
+
+        while self.used + length > self.budget or None not in self.buffers:
+            self.evict()
+
+        i = self.buffers.index(None)
+        self.starts[i] = start
+        self.buffers[i] = compile_text(self.program, start, end)
+        self.used_times[i] = self.clock
+        self.used += length
+        return self.buffers[i]
+
+    # Function to drop the least recently used text
+    def evict(self):
+        oldest = None
+        for i in range(self.size):
+            if self.buffers[i] is not None and (oldest is None or self.used_times[i] < self.used_times[oldest]):
+                oldest = i
+
+        self.used -= len(self.buffers[oldest])
+        self.starts[oldest] = None
+        self.buffers[oldest] = None
+        self.evictions += 1
+
+    # Function to print how the cache is doing over serial
+    def print_summary(self):
+        print(
+            "Report cache: {}/{} bytes hits={} misses={} evictions={}".format(
+                self.used,
+                self.budget,
+                self.hits,
+                self.misses,
+                self.evictions
+            )
+        )
@@ -0,0 +1,79 @@
+import asyncio
+
+from macropad.ticks import ticks_ms, ticks_diff
+
+# Runs an Engine as separate asyncio tasks instead of one loop
+# Scanning, handling button actions, LED animation and serial diagnostics each run at their
+# own pace, so slow LED or HID work never holds up a scan. Button handling is the same as
+# Engine.run(). Needs the asyncio and adafruit_ticks libraries in lib on CircuitPython
+# led_period: longest time in milliseconds between runs of the engine's tickers and timers
+# diagnostics_period: milliseconds between latency and timing summary checks
+class Runtime:
+    def __init__(self, engine, led_period=10, diagnostics_period=1000):
+        self.engine = engine
+        self.led_period = led_period
+        self.diagnostics_period = diagnostics_period
+        # Set by the scan task when it has queued events for the action task
+        self.ready = asyncio.Event()
+
+    # Scan task, reads the buttons on the engine's fixed scan schedule and wakes the action task
+    async def scan_task(self):
+        engine = self.engine
+        engine.scan["next_time"] = ticks_ms()
+        while True:
+            start = ticks_ms()
+            engine.scan_buttons()
+            if len(engine.events):
+                self.ready.set()
+            end = ticks_ms()
+            await asyncio.sleep(max(0, ticks_diff(engine.next_scan_time(start, end), end)) / 1000)
+
+    # Action task, handles button events and so sends the HID reports
+    # Sleeps until the scan task queues something
+    async def action_task(self):
+        engine = self.engine
+        while True:
+            self.ready.clear()
+            engine.handle_events()
+            if len(engine.events):
+                await asyncio.sleep(0)
+            else:
+                await self.ready.wait()
+
+    # LED and timer task, runs the engine's tickers and any timers that are due, such as
+    # hold button repeats and animations
+    async def led_task(self):
+        engine = self.engine
+        tickers = engine.tickers
+        timers = engine.timers
+        while True:
+            timers.run()
+            tickers.run()
+
+            delay = self.led_period
+            deadline = timers.next_deadline()
+            if deadline is not None:
+                delay = min(delay, max(0, ticks_diff(deadline, ticks_ms())))
+            await asyncio.sleep(delay / 1000)
+
+    # Diagnostics task, prints latency and loop timing summaries over serial
+    async def diagnostics_task(self):
+        while True:
+            if self.engine.latency:
+                self.engine.latency.poll()
+            self.engine.poll_timing()
+            await asyncio.sleep(self.diagnostics_period / 1000)
+
+    async def main(self):
+        await asyncio.gather(
+            asyncio.create_task(self.scan_task()),
+            asyncio.create_task(self.action_task()),
+            asyncio.create_task(self.led_task()),
+            asyncio.create_task(self.diagnostics_task())
+        )
+
+    # Function to run the keypad forever
+    # Takes the same arguments as Engine.start()
+    def run(self, hold_buttons=(), toggle_buttons=(), hold_delay=200):
+        self.engine.start(hold_buttons, toggle_buttons, hold_delay)
+        asyncio.run(self.main())
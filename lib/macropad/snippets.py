@@ -0,0 +1,135 @@
+import os
+import struct
+from array import array
+
+# Index file header: magic, version, store size, store mtime, snippet count
+# Each snippet follows as offset, length, name length and then the name
+INDEX_MAGIC = b"SI"
+INDEX_VERSION = 2
+INDEX_HEADER = "<2sBIIH"
+INDEX_ENTRY = "<IIB"
+
+# Store of long text snippets in a file on the CIRCUITPY drive, typed without loading them
+# into memory
+# The store is plain text, each snippet starts with a heading line "== name" and runs up
+# to the next heading, less any blank lines and the newline at its end, so snippets can be
+# separated by blank lines. Lines before the first heading are ignored
+#   == signature
+#   Best regards,
+#   The macropad
+# The index file records where each snippet is, so finding one doesn't read the store. It is
+# rebuilt when the store's size or modified time changes, if boot.py has made the drive
+# writable from code.py, otherwise the store is scanned once each boot
+# chunk_size: bytes read from the store at a time
+class Snippets:
+    def __init__(self, path, index_path=None, chunk_size=64):
+        self.path = path
+        self.chunk_size = chunk_size
+        self.names = []
+        self.offsets = array("I")
+        self.lengths = array("I")
+
+        stat = os.stat(path)
+        size = stat[6]
+        mtime = int(stat[8]) & 0xFFFFFFFF
+
+        if index_path:
+            try:
+                if self.read_index(index_path, size, mtime):
+                    return
+            except (OSError, ValueError):
+                pass
+
+        self.scan()
+
+        if index_path:
+            try:
+                self.write_index(index_path, size, mtime)
+            except OSError:
+                pass
+
+    # Function to find where every snippet is by reading through the store
+    def scan(self):
+        names = []
+        offsets = array("I")
+        lengths = array("I")
+        offset = 0
+        # End of the last line with something on it, less its newline
+        end = 0
+        with open(self.path, "rb") as file:
+            while True:
+                line = file.readline()
+                if not line or line.startswith(b"== "):
+                    if names:
+                        lengths.append(end - offsets[-1])
+                    if not line:
+                        break
+                    names.append(line[3:].strip())
+                    offsets.append(offset + len(line))
+                    end = offsets[-1]
+                else:
+                    text = line.rstrip(b"\r\n")
+                    if text:
+                        end = offset + len(text)
+                offset += len(line)
+
+        self.names = names
+        self.offsets = offsets
+        self.lengths = lengths
+
+    # Function to read the index file, returns False if it is for a different store or cut
+    # short
+    def read_index(self, path, size, mtime):
+        with open(path, "rb") as file:
+            header = file.read(struct.calcsize(INDEX_HEADER))
+            if len(header) != struct.calcsize(INDEX_HEADER):
+                # Cut short, such as by a power cut while it was being written
+                return False
+            magic, version, cached_size, cached_mtime, count = struct.unpack(INDEX_HEADER, header)
+            if (magic != INDEX_MAGIC or version != INDEX_VERSION
+                    or cached_size != size or cached_mtime != mtime):
+                return False
+
+            entry_size = struct.calcsize(INDEX_ENTRY)
+            for i in range(count):
+                entry = file.read(entry_size)
+                if len(entry) != entry_size:
+                    raise ValueError("Snippet index is truncated")
+                offset, length, name_length = struct.unpack(INDEX_ENTRY, entry)
+                name = file.read(name_length)
+                if len(name) != name_length:
+                    raise ValueError("Snippet index is truncated")
+                self.names.append(name)
+                self.offsets.append(offset)
+                self.lengths.append(length)
+        return True
+
+    # Function to save the index file
+    def write_index(self, path, size, mtime):
+        with open(path, "wb") as file:
+            file.write(struct.pack(INDEX_HEADER, INDEX_MAGIC, INDEX_VERSION, size, mtime, len(self.names)))
+            for i in range(len(self.names)):
+                file.write(struct.pack(INDEX_ENTRY, self.offsets[i], self.lengths[i], len(self.names[i])))
+                file.write(self.names[i])
+
+    # Function to find a snippet by name, as bytes, returns its number or None
+    def find(self, name):
+        for i in range(len(self.names)):
+            if self.names[i] == name:
+                return i
+        return None
+
+    # Generator that reads snippet number i a chunk at a time into buffer, yielding a
+    # memoryview of each chunk. Only buffer is used however long the snippet is, each chunk
+    # must be used before asking for the next
+    def read(self, i, buffer):
+        view = memoryview(buffer)
+        remaining = self.lengths[i]
+        with open(self.path, "rb") as file:
+            file.seek(self.offsets[i])
+            while remaining:
+                count = file.readinto(view[:min(remaining, len(buffer))])
+                if not count:
+                    return
+                remaining -= count
+                yield view[:count]
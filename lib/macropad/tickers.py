@@ -0,0 +1,64 @@
+from macropad.ticks import ticks_ms, ticks_add, ticks_diff
+
+# Registry of functions to call every loop
+# Only subscribed functions are called, so buttons and effects that aren't animating cost
+# nothing. Each subscriber can ask to be called at most every interval milliseconds, so slow
+# animations don't run at the scan rate
+class Tickers:
+    def __init__(self):
+        self.handlers = []
+        self.args = []
+        self.intervals = []
+        self.times = []
+
+    def __len__(self):
+        return len(self.handlers)
+
+    # Function to start calling handler(arg) every loop
+    # interval: least milliseconds between calls, 0 to call every loop
+    # Subscribing a handler that is already subscribed with the same arg updates its interval
+    def subscribe(self, handler, arg=None, interval=0):
+        i = self.find(handler, arg)
+        if i is None:
+            self.handlers.append(handler)
+            self.args.append(arg)
+            self.intervals.append(interval)
+            # Due straight away
+            self.times.append(ticks_add(ticks_ms(), -interval))
+        else:
+            self.intervals[i] = interval
+
+    # Function to stop calling handler(arg), does nothing if it isn't subscribed
+    def unsubscribe(self, handler, arg=None):
+        i = self.find(handler, arg)
+        if i is None:
+            return
+
+        # Move the last subscriber into the gap, run() goes backwards so it isn't skipped
+        last = len(self.handlers) - 1
+        self.handlers[i] = self.handlers[last]
+        self.args[i] = self.args[last]
+        self.intervals[i] = self.intervals[last]
+        self.times[i] = self.times[last]
+        self.handlers.pop()
+        self.args.pop()
+        self.intervals.pop()
+        self.times.pop()
+
+    # Function to find where handler(arg) is subscribed, None if it isn't
+    def find(self, handler, arg=None):
+        for i in range(len(self.handlers)):
+            if self.handlers[i] is handler and self.args[i] == arg:
+                return i
+        return None
+
+    # Function to call every subscriber that is due
+    # Subscribers may subscribe and unsubscribe while this runs
+    def run(self):
+        now = ticks_ms()
+        i = len(self.handlers) - 1
+        while i >= 0:
+            if i < len(self.handlers) and ticks_diff(now, self.times[i]) >= self.intervals[i]:
+                self.times[i] = now
+                self.handlers[i](self.args[i])
+            i -= 1
@@ -0,0 +1,34 @@
+import time
+
+# Integer millisecond clock used for all engine timing
+# time.monotonic() is a float, and on CircuitPython it loses sub-second precision after a few
+# days of uptime. ticks_ms() counts whole milliseconds and wraps round every 2**29 ms (about
+# 6.2 days), so always compare ticks with ticks_diff() rather than subtracting them, which
+# stays correct across the wrap for anything less than half a period (about 3.1 days) apart
+TICKS_PERIOD = 1 << 29
+TICKS_MAX = TICKS_PERIOD - 1
+TICKS_HALFPERIOD = TICKS_PERIOD // 2
+
+try:
+    # CircuitPython 7 onwards
+    from supervisor import ticks_ms
+except ImportError:
+    if hasattr(time, "monotonic_ns"):
+        def ticks_ms():
+            return (time.monotonic_ns() // 1000000) & TICKS_MAX
+    else:
+        def ticks_ms():
+            return int(time.monotonic() * 1000) & TICKS_MAX
+
+# Function to get the ticks delta milliseconds after ticks, delta may be negative
+def ticks_add(ticks, delta):
+    return (ticks + delta) & TICKS_MAX
+
+# Function to get the milliseconds from ticks2 to ticks1, negative if ticks1 is earlier
+def ticks_diff(ticks1, ticks2):
+    diff = (ticks1 - ticks2) & TICKS_MAX
+    return ((diff + TICKS_HALFPERIOD) & TICKS_MAX) - TICKS_HALFPERIOD
+
+# Function to check whether ticks1 is earlier than ticks2
+def ticks_less(ticks1, ticks2):
+    return ticks_diff(ticks1, ticks2) < 0
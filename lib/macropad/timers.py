@@ -0,0 +1,125 @@
+from macropad.ticks import ticks_ms, ticks_add, ticks_diff
+
+# Timer service, calls functions when their deadline comes round
+# Deadlines are kept in a binary min-heap so finding the next one due is instant, and the
+# loop can sleep until then instead of polling. Storage for size timers is allocated once,
+# a timer is identified by its callback and arg so starting it again just moves it
+class Timers:
+    def __init__(self, size=32):
+        self.size = size
+        self.deadlines = [0] * size
+        self.periods = [0] * size
+        self.callbacks = [None] * size
+        self.args = [None] * size
+        # Slot numbers, ordered as a min-heap on deadline
+        self.heap = bytearray(size)
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    # Function to call callback(arg) at deadline, a ticks_ms() time
+    # period: milliseconds between repeats, 0 to only call once
+    def call_at(self, deadline, callback, arg=None, period=0):
+        i = self.find(callback, arg)
+        if i is None:
+            if self.count == self.size:
+                raise RuntimeError("Too many timers")
+            slot = self.callbacks.index(None)
+            self.callbacks[slot] = callback
+            self.args[slot] = arg
+            self.heap[self.count] = slot
+            i = self.count
+            self.count += 1
+        else:
+            slot = self.heap[i]
+
+        self.deadlines[slot] = deadline
+        self.periods[slot] = period
+        self.sift(i)
+
+    # Function to call callback(arg) in delay milliseconds
+    def call_later(self, delay, callback, arg=None):
+        self.call_at(ticks_add(ticks_ms(), delay), callback, arg)
+
+    # Function to call callback(arg) every period milliseconds, starting one period from now
+    def call_every(self, period, callback, arg=None):
+        self.call_at(ticks_add(ticks_ms(), period), callback, arg, period)
+
+    # Function to stop a timer, does nothing if it isn't running
+    def cancel(self, callback, arg=None):
+        i = self.find(callback, arg)
+        if i is not None:
+            self.remove(i)
+
+    # Function to find a timer's place in the heap, None if it isn't running
+    def find(self, callback, arg=None):
+        for i in range(self.count):
+            slot = self.heap[i]
+            if self.callbacks[slot] is callback and self.args[slot] == arg:
+                return i
+        return None
+
+    # Function to get the deadline of the next timer due, None if no timers are running
+    def next_deadline(self):
+        if not self.count:
+            return None
+        return self.deadlines[self.heap[0]]
+
+    # Function to call every timer that is due
+    # Callbacks may start and cancel timers while this runs
+    def run(self):
+        now = ticks_ms()
+        while self.count and ticks_diff(self.deadlines[self.heap[0]], now) <= 0:
+            slot = self.heap[0]
+            callback = self.callbacks[slot]
+            arg = self.args[slot]
+            period = self.periods[slot]
+            if period:
+                # Step on from the deadline rather than now, so repeats don't drift
+                self.deadlines[slot] = ticks_add(self.deadlines[slot], period)
+                if ticks_diff(self.deadlines[slot], now) <= 0:
+                    self.deadlines[slot] = ticks_add(now, period)
+                self.sift(0)
+            else:
+                self.remove(0)
+            callback(arg)
+
+    # Function to take the timer at heap position i out of the heap
+    def remove(self, i):
+        slot = self.heap[i]
+        self.callbacks[slot] = None
+        self.args[slot] = None
+        self.count -= 1
+        if i != self.count:
+            self.heap[i] = self.heap[self.count]
+            self.sift(i)
+
+    # Function to move the timer at heap position i up or down to where its deadline belongs
+    def sift(self, i):
+        heap = self.heap
+        deadlines = self.deadlines
+        slot = heap[i]
+        deadline = deadlines[slot]
+
+        # Up towards the root while earlier than the parent
+        while i:
+            parent = (i - 1) >> 1
+            if ticks_diff(deadlines[heap[parent]], deadline) <= 0:
+                break
+            heap[i] = heap[parent]
+            i = parent
+
+        # Down towards the leaves while later than the earliest child
+        while True:
+            child = 2 * i + 1
+            if child >= self.count:
+                break
+            if child + 1 < self.count and ticks_diff(deadlines[heap[child + 1]], deadlines[heap[child]]) < 0:
+                child += 1
+            if ticks_diff(deadline, deadlines[heap[child]]) <= 0:
+                break
+            heap[i] = heap[child]
+            i = child
+
+        heap[i] = slot
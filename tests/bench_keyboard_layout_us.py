@@ -0,0 +1,21 @@
+# Host benchmark for KeyboardLayoutUS.write(), run with python tests/bench_keyboard_layout_us.py
+# Counts the HID reports each typing mode sends per character, checks the text decodes back
+# the same, and times the host side of write()
+import time
+
+import conftest  # puts the stubs and lib on sys.path
+
+from test_keyboard_layout_us import TEXT, decode, type_text
+
+for fast in (False, True):
+    start = time.perf_counter()
+    reports = type_text(TEXT, fast)
+    took = time.perf_counter() - start
+    assert decode(reports) == TEXT
+    print(
+        "{}: {:.2f} reports/char, {:.1f} us/char on the host".format(
+            "fast" if fast else "slow",
+            len(reports) / len(TEXT),
+            took / len(TEXT) * 1e6
+        )
+    )
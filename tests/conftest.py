@@ -0,0 +1,44 @@
+import importlib
+import os
+import sys
+
+import pytest
+
+# Host stand-ins for the CircuitPython modules come first, then the code copied to CIRCUITPY
+TESTS = os.path.dirname(__file__)
+sys.path.insert(0, os.path.join(TESTS, "..", "lib"))
+sys.path.insert(0, os.path.join(TESTS, "stubs"))
+
+from macropad.ticks import TICKS_MAX, TICKS_PERIOD
+
+# Modules that take ticks_ms from macropad.ticks, and so need it patched where they use it
+TICKS_MODULES = (
+    "macropad.ticks",
+    "macropad.timers",
+    "macropad.tickers",
+    "macropad.engine",
+    "macropad.latency",
+    "macropad.macros",
+    "macropad.boards.pico_rgb_keypad",
+)
+
+
+# Virtual millisecond clock, counts on forever and wraps like supervisor.ticks_ms()
+class Clock:
+    def __init__(self, now):
+        self.now = now
+
+    def ticks_ms(self):
+        return self.now & TICKS_MAX
+
+    def advance(self, ms):
+        self.now += ms
+
+
+# Clock starting a second before ticks_ms() wraps round, patched into every module using it
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock(TICKS_PERIOD - 1000)
+    for name in TICKS_MODULES:
+        monkeypatch.setattr(importlib.import_module(name), "ticks_ms", clock.ticks_ms)
+    return clock
@@ -0,0 +1,46 @@
+# Host stand-in for adafruit_bus_device.i2c_device, playing a TCA9555 keypad expander
+# A test presses buttons with press(), bit n is button n. Like the real expander, a change
+# pulls the INT pin low until the inputs are read, if a test has wired interrupt to a pin.
+# devices keeps every expander made so a test can find the one code.py made
+
+
+devices = []
+
+
+class I2CDevice:
+    def __init__(self, i2c, device_address):
+        self.i2c = i2c
+        self.device_address = device_address
+        self.pressed = 0
+        self.reads = 0
+        self.interrupt = None
+        devices.append(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    # Function to change the buttons held down, missed leaves INT alone as if the edge was lost
+    def press(self, pressed, missed=False):
+        self.pressed = pressed
+        if self.interrupt is not None and not missed:
+            self.interrupt.value = False
+
+    # Selects the register to read, the inputs are always read from port 0 onwards
+    def write(self, buffer):
+        pass
+
+    def readinto(self, buffer):
+        self.reads += 1
+        # Inputs are pulled up, a pressed button reads as 0
+        inputs = ~self.pressed & 0xFFFF
+        buffer[0] = inputs & 0xFF
+        buffer[1] = inputs >> 8
+        if self.interrupt is not None:
+            self.interrupt.value = True
+
+    def write_then_readinto(self, out_buffer, in_buffer):
+        self.write(out_buffer)
+        self.readinto(in_buffer)
@@ -0,0 +1,7 @@
+# Host stand-in for adafruit_dotstar, the pixels are just a list of colours
+
+
+class DotStar(list):
+    def __init__(self, clock, data, n, brightness=1.0, auto_write=True):
+        super().__init__([(0, 0, 0)] * n)
+        self.brightness = brightness
@@ -0,0 +1,3 @@
+# Host stand-in for CircuitPython's board module, every pin is just its name
+def __getattr__(name):
+    return name
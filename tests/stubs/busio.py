@@ -0,0 +1,12 @@
+# Host stand-in for CircuitPython's busio module, the buses do nothing themselves
+
+
+class I2C:
+    def __init__(self, scl, sda, frequency=100000):
+        self.scl = scl
+        self.sda = sda
+
+
+class SPI:
+    def __init__(self, clock, MOSI=None, MISO=None):
+        self.clock = clock
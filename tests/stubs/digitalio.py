@@ -0,0 +1,32 @@
+# Host stand-in for CircuitPython's digitalio module
+# A pin's value can be set by a test to play the part of whatever drives it, pins keeps
+# every DigitalInOut made so a test can find the one code.py made for a pin
+
+
+class Direction:
+    INPUT = 0
+    OUTPUT = 1
+
+
+class Pull:
+    UP = 1
+    DOWN = 2
+
+
+pins = {}
+
+
+class DigitalInOut:
+    def __init__(self, pin):
+        self.pin = pin
+        self.direction = Direction.INPUT
+        self.value = False
+        pins[pin] = self
+
+    # Inputs read as their pull until something drives them
+    def switch_to_input(self, pull=None):
+        self.direction = Direction.INPUT
+        self.value = pull == Pull.UP
+
+    def deinit(self):
+        pass
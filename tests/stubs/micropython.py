@@ -0,0 +1,3 @@
+# Host stand-in for MicroPython's micropython module
+def const(value):
+    return value
@@ -0,0 +1,16 @@
+# Host stand-in for CircuitPython's usb_hid module
+# Each device keeps the reports sent to it, with the time.monotonic() they were sent at
+import time
+
+
+class Device:
+    def __init__(self, usage_page, usage):
+        self.usage_page = usage_page
+        self.usage = usage
+        self.reports = []
+
+    def send_report(self, report, report_id=None):
+        self.reports.append((time.monotonic(), bytes(report)))
+
+
+devices = [Device(0x01, 0x06), Device(0x01, 0x02), Device(0x0C, 0x01)]
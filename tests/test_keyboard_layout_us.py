@@ -0,0 +1,72 @@
+import pytest
+
+from adafruit_hid.keyboard import Keyboard
+from adafruit_hid.keyboard_layout_us import KeyboardLayoutUS
+
+# Text with shifted runs, repeated letters and every kind of character write() handles
+TEXT = (
+    "Hello, World! The quick brown fox jumps over the lazy dog. Aa aa AA 1234!!@@ "
+    "def foo(bar):\n\treturn {'x': [1, 2, 3]}\n"
+) * 20
+
+SHIFT_BITS = 0x22
+
+# Character each key types, with and without SHIFT
+CHARACTERS = {}
+for char in range(128):
+    keycode = KeyboardLayoutUS.ASCII_TO_KEYCODE[char]
+    if keycode:
+        CHARACTERS[(keycode & ~KeyboardLayoutUS.SHIFT_FLAG, bool(keycode & KeyboardLayoutUS.SHIFT_FLAG))] = chr(char)
+
+
+# Keyboard HID device that keeps every report it is sent
+class FakeDevice:
+    usage_page = 0x1
+    usage = 0x06
+
+    def __init__(self):
+        self.reports = []
+
+    def send_report(self, report, report_id=None):
+        self.reports.append(bytes(report))
+
+
+# Function to get the text a host would see from a list of 8 byte keyboard reports
+# A character is typed whenever its key goes down
+def decode(reports):
+    text = []
+    previous = set()
+    for report in reports:
+        keys = set(report[2:]) - {0}
+        for keycode in keys - previous:
+            text.append(CHARACTERS[(keycode, bool(report[0] & SHIFT_BITS))])
+        previous = keys
+    return "".join(text)
+
+
+# Function to type text with write(), returns the reports sent
+def type_text(text, fast):
+    device = FakeDevice()
+    layout = KeyboardLayoutUS(Keyboard(device))
+    device.reports.clear()
+    layout.write(text, fast=fast)
+    return device.reports
+
+
+@pytest.mark.parametrize("fast", (False, True))
+def test_write_types_the_text(fast):
+    reports = type_text(TEXT, fast)
+    assert decode(reports) == TEXT
+    # Nothing is left pressed
+    assert reports[-1] == bytes(8)
+
+
+@pytest.mark.parametrize("text", ("aa", "AA", "aA", "Aa", "a", "!1!", "\n\n"))
+def test_fast_write_repeated_and_shifted_keys(text):
+    assert decode(type_text(text, True)) == text
+
+
+def test_fast_write_sends_fewer_reports():
+    slow = len(type_text(TEXT, False))
+    fast = len(type_text(TEXT, True))
+    assert fast < slow * 0.6
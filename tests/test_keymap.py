@@ -0,0 +1,402 @@
+import json
+import os
+import struct
+
+import pytest
+import usb_hid
+
+from adafruit_hid.consumer_control import ConsumerControl
+from adafruit_hid.keyboard import Keyboard
+from adafruit_hid.keycode import Keycode
+
+from macropad.engine import Engine
+from macropad.keymap import CACHE_HEADER, Keymap
+
+
+# Board with buttons a test presses by setting pressed, bit n is button n
+class FakeBoard:
+    button_count = 16
+
+    def __init__(self):
+        self.pressed = 0
+        self.pixels = [(0, 0, 0)] * self.button_count
+
+    def button_states(self):
+        return self.pressed
+
+    def button_changed(self):
+        return True
+
+    def set_pixel(self, button, colour):
+        self.pixels[button] = colour
+
+    def clear_pixel(self, button):
+        self.pixels[button] = (0, 0, 0)
+
+
+# Keypad running a keymap on the virtual clock, keeping the HID reports it sends
+# snippets: optional Snippets store for the keymap's macros
+class Pad:
+    def __init__(self, clock, source, snippets=None):
+        self.clock = clock
+        self.board = FakeBoard()
+        self.engine = Engine(self.board)
+        self.keyboard = usb_hid.Device(0x01, 0x06)
+        self.consumer = usb_hid.Device(0x0C, 0x01)
+        devices = [self.keyboard, self.consumer]
+        self.keymap = Keymap(self.board.button_count)
+        self.keymap.compile(source)
+        self.keymap.snippets = snippets
+        self.keymap.apply(self.engine, Keyboard(devices), ConsumerControl(devices))
+        self.engine.start()
+        self.keyboard.reports.clear()
+        self.consumer.reports.clear()
+
+    # Function to run the engine's loop every millisecond for a number of milliseconds
+    def run(self, ms):
+        engine = self.engine
+        for i in range(ms):
+            self.clock.advance(1)
+            engine.scan_buttons()
+            engine.handle_events()
+            engine.timers.run()
+
+    # Functions to press or release buttons, then run long enough for it to be handled
+    def press(self, *buttons, ms=10):
+        for button in buttons:
+            self.board.pressed |= 1 << button
+        self.run(ms)
+
+    def release(self, *buttons, ms=10):
+        for button in buttons:
+            self.board.pressed &= ~(1 << button)
+        self.run(ms)
+
+    # Function to get the keyboard reports sent, and forget them
+    def reports(self):
+        reports = [report for at, report in self.keyboard.reports]
+        self.keyboard.reports.clear()
+        return reports
+
+
+# Function to make the keyboard report for keys held down, modifiers go in the first byte
+def report(*keycodes):
+    data = bytearray(8)
+    j = 2
+    for keycode in keycodes:
+        if keycode >= Keycode.LEFT_CONTROL:
+            data[0] |= 1 << (keycode - Keycode.LEFT_CONTROL)
+        else:
+            data[j] = keycode
+            j += 1
+    return bytes(data)
+
+
+# Function to get the reports for tapping a key
+def tap(*keycodes):
+    return [report(*keycodes), report()]
+
+
+LAYERS = {
+    "layers": [
+        {"keys": [
+            {"button": 0, "layer": 1, "mode": "momentary"},
+            {"button": 1, "send": ["A"], "colour": [0, 0, 255]},
+            {"button": 2, "press": ["LEFT_CONTROL"]},
+            {"button": 3, "layer": 2, "mode": "toggle"},
+            {"button": 4, "layer": 1, "mode": "one_shot"},
+            {"button": 5, "send": ["C"], "hold": True}
+        ]},
+        {"keys": [
+            {"button": 1, "send": ["B"], "colour": [255, 0, 0]},
+            {"button": 2, "press": ["LEFT_SHIFT"]},
+            {"button": 5, "send": ["D"], "hold": True}
+        ]},
+        {"keys": [
+            {"button": 1, "send": ["E"]}
+        ]}
+    ]
+}
+
+
+def test_button_does_what_the_highest_active_layer_says(clock):
+    pad = Pad(clock, LAYERS)
+    assert pad.board.pixels[1] == (0, 0, 255)
+    pad.press(1)
+    pad.release(1)
+    assert pad.reports() == tap(Keycode.A)
+
+    pad.press(0)
+    assert pad.board.pixels[1] == (255, 0, 0)
+    pad.press(1)
+    pad.release(1)
+    assert pad.reports() == tap(Keycode.B)
+
+    # Layer 2 is above layer 1, and layer 1 still shows through where layer 2 is empty
+    pad.press(3)
+    pad.release(3)
+    pad.press(1)
+    pad.release(1)
+    assert pad.reports() == tap(Keycode.E)
+    pad.release(0)
+    pad.press(3)
+    pad.release(3)
+    pad.press(1)
+    pad.release(1)
+    assert pad.reports() == tap(Keycode.A)
+    assert pad.board.pixels[1] == (0, 0, 255)
+
+
+def test_one_shot_layer_lasts_for_one_press(clock):
+    pad = Pad(clock, LAYERS)
+    pad.press(4)
+    pad.release(4)
+    for i in range(2):
+        pad.press(1)
+        pad.release(1)
+    assert pad.reports() == tap(Keycode.B) + tap(Keycode.A)
+
+
+def test_release_undoes_the_press_when_layers_change(clock):
+    pad = Pad(clock, LAYERS)
+    pad.press(0)
+    pad.press(2)
+    pad.release(0)
+    assert pad.reports() == [report(Keycode.LEFT_SHIFT)]
+    # Released on layer 0, but pressed on layer 1
+    pad.release(2)
+    assert pad.reports() == [report()]
+
+
+def test_hold_repeats_on_the_layer_it_was_pressed_on(clock):
+    pad = Pad(clock, LAYERS)
+    pad.press(0)
+    pad.press(5)
+    pad.release(0)
+    pad.run(pad.keymap.hold_delay * 2)
+    pad.release(5)
+    assert pad.reports() == tap(Keycode.D) * 3
+
+
+TAP_HOLD = {
+    "tapping_term": 200,
+    "keys": [
+        {"button": 6, "send": ["ESCAPE"], "on_hold": {"press": ["LEFT_CONTROL"]}},
+        {"button": 7, "send": ["C"]}
+    ]
+}
+
+
+def test_tap_does_the_buttons_own_action(clock):
+    pad = Pad(clock, TAP_HOLD)
+    pad.press(6)
+    pad.release(6)
+    assert pad.reports() == tap(Keycode.ESCAPE)
+
+
+def test_hold_does_the_on_hold_action(clock):
+    pad = Pad(clock, TAP_HOLD)
+    pad.press(6, ms=250)
+    assert pad.reports() == [report(Keycode.LEFT_CONTROL)]
+    # A send leaves the held modifier down
+    pad.press(7)
+    pad.release(7)
+    assert pad.reports() == [report(Keycode.LEFT_CONTROL, Keycode.C), report(Keycode.LEFT_CONTROL)]
+    pad.release(6)
+    assert pad.reports() == [report()]
+
+
+def test_permissive_hold(clock):
+    pad = Pad(clock, TAP_HOLD)
+    pad.press(6)
+    pad.press(7)
+    assert pad.reports() == []
+    pad.release(7)
+    pad.release(6)
+    assert pad.reports() == [
+        report(Keycode.LEFT_CONTROL),
+        report(Keycode.LEFT_CONTROL, Keycode.C),
+        report(Keycode.LEFT_CONTROL),
+        report()
+    ]
+
+
+def test_without_permissive_hold_both_are_taps_in_order(clock):
+    pad = Pad(clock, dict(TAP_HOLD, permissive_hold=False))
+    pad.press(6)
+    pad.press(7)
+    pad.release(7)
+    pad.release(6)
+    assert pad.reports() == tap(Keycode.ESCAPE) + tap(Keycode.C)
+
+
+def test_retro_tap(clock):
+    pad = Pad(clock, dict(TAP_HOLD, retro_tap=True))
+    pad.press(6, ms=250)
+    pad.release(6)
+    assert pad.reports() == [report(Keycode.LEFT_CONTROL), report()] + tap(Keycode.ESCAPE)
+
+    # Not once another button was used while it was held
+    pad.press(6, ms=250)
+    pad.press(7)
+    pad.release(7)
+    pad.release(6)
+    assert report(Keycode.ESCAPE) not in pad.reports()
+
+
+COMBOS = {
+    "combo_term": 50,
+    "hold_delay": 40,
+    "combos": [
+        {"buttons": [8, 9], "send": ["Z"]}
+    ],
+    "keys": [
+        {"button": 8, "send": ["X"], "hold": True},
+        {"button": 9, "send": ["Y"]}
+    ]
+}
+
+
+def test_combo_fires_instead_of_its_buttons(clock):
+    pad = Pad(clock, COMBOS)
+    pad.press(8, ms=20)
+    pad.press(9)
+    pad.release(8, 9)
+    assert pad.reports() == tap(Keycode.Z)
+
+
+def test_combo_falls_back_to_the_buttons(clock):
+    pad = Pad(clock, COMBOS)
+    # Nothing else pressed within combo_term
+    pad.press(8, ms=30)
+    pad.release(8)
+    assert pad.reports() == tap(Keycode.X)
+    pad.press(9, ms=60)
+    pad.press(8, ms=30)
+    pad.release(8, 9)
+    assert pad.reports() == tap(Keycode.Y) + tap(Keycode.X)
+
+
+def test_hold_repeats_wait_for_the_combo(clock):
+    pad = Pad(clock, dict(COMBOS, combo_term=500))
+    # Repeats every 40 ms while the combo is undecided would fill combo_order
+    pad.press(8, ms=450)
+    assert pad.reports() == []
+    pad.release(8)
+    assert pad.reports() == tap(Keycode.X)
+
+
+LEADER = {
+    "leader_timeout": 1000,
+    "leader_colour": [255, 255, 255],
+    "sequences": [
+        {"keys": [11, 12], "send": ["A"]},
+        {"keys": [11], "send": ["B"]},
+        {"keys": [12, 12], "send": ["C"]}
+    ],
+    "keys": [
+        {"button": 10, "leader": True},
+        {"button": 11, "send": ["X"], "colour": [0, 0, 255]},
+        {"button": 12, "send": ["Y"]},
+        {"button": 13, "send": ["Z"]}
+    ]
+}
+
+
+# Function to press and release buttons one after another
+def type_buttons(pad, *buttons):
+    for button in buttons:
+        pad.press(button)
+        pad.release(button)
+
+
+def test_leader_sequence_fires_when_nothing_longer_could_follow(clock):
+    pad = Pad(clock, LEADER)
+    pad.press(10)
+    # Only the buttons that start a sequence are lit
+    assert pad.board.pixels[11] == (255, 255, 255)
+    assert pad.board.pixels[12] == (255, 255, 255)
+    assert pad.board.pixels[13] == (0, 0, 0)
+    pad.release(10)
+    type_buttons(pad, 11, 12)
+    assert pad.reports() == tap(Keycode.A)
+    assert pad.board.pixels[11] == (0, 0, 255)
+
+    type_buttons(pad, 10, 12, 12)
+    assert pad.reports() == tap(Keycode.C)
+
+
+def test_leader_sequence_fires_on_timeout(clock):
+    pad = Pad(clock, LEADER)
+    type_buttons(pad, 10, 11)
+    pad.run(pad.keymap.leader_timeout - 40)
+    assert pad.reports() == []
+    pad.run(40)
+    assert pad.reports() == tap(Keycode.B)
+
+    # Timing out part way through a sequence does nothing
+    type_buttons(pad, 10, 12)
+    pad.run(pad.keymap.leader_timeout)
+    assert pad.reports() == []
+
+
+def test_leader_gives_up_on_a_button_that_starts_no_sequence(clock):
+    pad = Pad(clock, LEADER)
+    type_buttons(pad, 10, 13)
+    assert pad.reports() == []
+    type_buttons(pad, 11)
+    assert pad.reports() == tap(Keycode.X)
+
+
+KEYMAP = dict(LAYERS, combos=COMBOS["combos"], sequences=LEADER["sequences"], tapping_term=150, retro_tap=True)
+
+
+# Function to write a keymap source to keymap.json, returns its path and the cache's
+def write_keymap(tmp_path, source):
+    path = tmp_path / "keymap.json"
+    path.write_text(json.dumps(source))
+    return str(path), str(tmp_path / "keymap.cache")
+
+
+# Function to get everything compiled into a keymap, to compare two keymaps
+def compiled(keymap):
+    tables = [bytes(table) for table, length in keymap.tables()]
+    return (tables, keymap.layer_count, keymap.hold_delay, keymap.tapping_term,
+            keymap.tap_hold_options, keymap.combo_term, keymap.leader_timeout)
+
+
+def test_cache_round_trip(tmp_path, monkeypatch):
+    path, cache = write_keymap(tmp_path, KEYMAP)
+    first = Keymap(16).load(path, cache)
+    assert os.path.exists(cache)
+
+    # The next boot reads the tables back without compiling anything
+    def compile(self, source):
+        raise AssertionError("Compiled instead of reading the cache")
+
+    monkeypatch.setattr(Keymap, "compile", compile)
+    assert compiled(Keymap(16).load(path, cache)) == compiled(first)
+
+
+def test_cache_is_replaced_when_the_keymap_changes(tmp_path):
+    path, cache = write_keymap(tmp_path, KEYMAP)
+    Keymap(16).load(path, cache)
+    # Same size, so only the modified time shows it changed
+    mtime = os.stat(path).st_mtime
+    write_keymap(tmp_path, dict(KEYMAP, tapping_term=300))
+    os.utime(path, (mtime + 10, mtime + 10))
+    assert Keymap(16).load(path, cache).tapping_term == 300
+    assert Keymap(16).load(path, cache).tapping_term == 300
+
+
+@pytest.mark.parametrize("length", (0, 5, struct.calcsize(CACHE_HEADER), struct.calcsize(CACHE_HEADER) + 10))
+def test_cut_short_cache_is_recompiled(tmp_path, length):
+    path, cache = write_keymap(tmp_path, KEYMAP)
+    first = Keymap(16).load(path, cache)
+    size = os.path.getsize(cache)
+    with open(cache, "r+b") as file:
+        file.truncate(length)
+
+    assert compiled(Keymap(16).load(path, cache)) == compiled(first)
+    # and written out whole again
+    assert os.path.getsize(cache) == size
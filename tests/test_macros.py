@@ -0,0 +1,224 @@
+import os
+import struct
+
+import pytest
+
+from adafruit_hid.consumer_control_code import ConsumerControlCode
+from adafruit_hid.keycode import Keycode
+
+from macropad.report_cache import ReportCache, compile_text, count_reports
+from macropad.snippets import INDEX_HEADER, Snippets
+
+from test_keyboard_layout_us import TEXT, decode
+from test_keymap import Pad, report
+
+MACROS = {
+    "keys": [
+        {"button": 0, "macro": ["Hello, World! " * 4]},
+        {"button": 1, "macro": [
+            {"consumer": "VOLUME_INCREMENT"},
+            {"delay": 5},
+            {"consumer": "VOLUME_INCREMENT"},
+            "abc",
+            {"tap": ["ENTER"]}
+        ]},
+        {"button": 2, "macro": [{"press": ["LEFT_SHIFT"]}, {"delay": 1000}, "x"]}
+    ]
+}
+
+
+def test_macro_types_its_text(clock):
+    pad = Pad(clock, MACROS)
+    pad.press(0)
+    pad.release(0, ms=500)
+    reports = pad.reports()
+    assert decode(reports) == "Hello, World! " * 4
+    assert reports[-1] == report()
+
+
+def test_second_press_cancels_the_macro(clock):
+    pad = Pad(clock, MACROS)
+    pad.press(0)
+    pad.release(0)
+    pad.press(0)
+    pad.release(0, ms=500)
+    reports = pad.reports()
+    text = decode(reports)
+    assert text and len(text) < len("Hello, World! " * 4)
+    assert ("Hello, World! " * 4).startswith(text)
+    assert reports[-1] == report()
+
+
+def test_cancel_releases_held_keys(clock):
+    pad = Pad(clock, MACROS)
+    pad.press(2)
+    pad.release(2)
+    assert pad.reports() == [report(Keycode.LEFT_SHIFT)]
+    pad.press(2)
+    pad.release(2, ms=2000)
+    assert pad.reports() == [report()]
+
+
+def test_macros_take_turns_at_the_keyboard(clock):
+    pad = Pad(clock, MACROS)
+    pad.press(0, 1, ms=20)
+    # The second macro's consumer steps don't wait
+    increments = [data for at, data in pad.consumer.reports if data[0] == ConsumerControlCode.VOLUME_INCREMENT]
+    assert len(increments) == 2
+    pad.release(0, 1, ms=500)
+    assert decode(pad.reports()) == "Hello, World! " * 4 + "abc\n"
+
+
+# Function to split compiled reports into 8 byte reports, adding the final release
+def split(reports):
+    return [bytes(reports[i:i + 8]) for i in range(0, len(reports), 8)] + [report()]
+
+
+def test_compiled_text_types_the_text():
+    program = bytearray(TEXT.encode())
+    reports = compile_text(program, 0, len(program))
+    assert len(reports) == count_reports(program, 0, len(program)) * 8
+    assert decode(split(reports)) == TEXT
+
+
+def test_macro_text_is_sent_from_the_cache(clock):
+    pad = Pad(clock, MACROS)
+    cache = pad.keymap.macros.cache
+    # Every macro's text is compiled on boot
+    assert cache.misses == 3
+    pad.press(0)
+    pad.release(0, ms=500)
+    assert decode(pad.reports()) == "Hello, World! " * 4
+    assert cache.hits == 1
+
+
+def test_cache_drops_the_least_recently_used_text():
+    program = bytearray(b"abcdefghijklmnopQRSTUVWXYZQRS")
+    # Room for three texts of four reports
+    cache = ReportCache(program, budget=3 * 4 * 8)
+    a = cache.get(0, 4)
+    b = cache.get(4, 8)
+    cache.get(8, 12)
+    assert cache.used == cache.budget
+    assert cache.get(0, 4) is a
+    assert cache.hits == 1
+
+    # b is now the least recently used
+    cache.get(12, 16)
+    assert cache.evictions == 1
+    assert cache.get(0, 4) is a
+    assert cache.get(4, 8) is not b
+    assert cache.misses == 5
+
+    # Too big for the whole budget, never cached
+    assert cache.get(16, len(program)) is None
+    assert cache.used <= cache.budget
+
+
+STORE = b"""Notes before the first snippet
+== signature
+Best regards,
+The macropad
+
+
+== address
+1 Long Road
+Somewhere
+== empty
+"""
+
+
+# Function to write the snippet store, returns its path and the index's path
+def write_store(tmp_path, store=STORE):
+    path = tmp_path / "snippets.txt"
+    path.write_bytes(store)
+    return str(path), str(tmp_path / "snippets.idx")
+
+
+# Function to read all of snippet i, checking no chunk is bigger than the store's chunk size
+def read_all(snippets, i):
+    text = b""
+    for chunk in snippets.read(i, bytearray(snippets.chunk_size)):
+        assert 0 < len(chunk) <= snippets.chunk_size
+        text += bytes(chunk)
+    return text
+
+
+def test_snippets_are_found_and_read_in_chunks(tmp_path):
+    path, index_path = write_store(tmp_path)
+    snippets = Snippets(path, chunk_size=4)
+    assert snippets.names == [b"signature", b"address", b"empty"]
+    assert read_all(snippets, snippets.find(b"signature")) == b"Best regards,\nThe macropad"
+    assert read_all(snippets, snippets.find(b"address")) == b"1 Long Road\nSomewhere"
+    assert read_all(snippets, snippets.find(b"empty")) == b""
+    assert snippets.find(b"missing") is None
+
+
+def test_snippet_index_is_read_instead_of_the_store(tmp_path, monkeypatch):
+    path, index_path = write_store(tmp_path)
+    scanned = Snippets(path, index_path)
+
+    def scan(self):
+        raise AssertionError("Store scanned")
+
+    monkeypatch.setattr(Snippets, "scan", scan)
+    snippets = Snippets(path, index_path)
+    assert snippets.names == scanned.names
+    assert snippets.offsets == scanned.offsets
+    assert snippets.lengths == scanned.lengths
+
+
+def test_snippet_index_is_rebuilt_when_the_store_changes(tmp_path):
+    path, index_path = write_store(tmp_path)
+    Snippets(path, index_path)
+    path, index_path = write_store(tmp_path, STORE + b"== more\ntext\n")
+    snippets = Snippets(path, index_path)
+    assert read_all(snippets, snippets.find(b"more")) == b"text"
+    assert Snippets(path, index_path).names == snippets.names
+
+
+# Index cut short in its header, in the first entry, and in the last name
+@pytest.mark.parametrize("length", [0, struct.calcsize(INDEX_HEADER) - 1,
+                                    struct.calcsize(INDEX_HEADER) + 3, -1])
+def test_truncated_snippet_index_is_rebuilt(tmp_path, length):
+    path, index_path = write_store(tmp_path)
+    scanned = Snippets(path, index_path)
+    with open(index_path, "rb") as file:
+        index = file.read()
+    with open(index_path, "wb") as file:
+        file.write(index[:length])
+
+    snippets = Snippets(path, index_path)
+    assert snippets.names == scanned.names
+    assert snippets.offsets == scanned.offsets
+    assert snippets.lengths == scanned.lengths
+    # Rewritten whole
+    with open(index_path, "rb") as file:
+        assert file.read() == index
+
+
+def test_truncated_snippet_index_entry_is_an_error(tmp_path):
+    path, index_path = write_store(tmp_path)
+    snippets = Snippets(path, index_path)
+    with open(index_path, "rb") as file:
+        index = file.read()
+    with open(index_path, "wb") as file:
+        file.write(index[:-1])
+
+    stat = os.stat(path)
+    with pytest.raises(ValueError):
+        snippets.read_index(index_path, stat[6], int(stat[8]) & 0xFFFFFFFF)
+    with open(index_path, "wb") as file:
+        file.write(index[:struct.calcsize(INDEX_HEADER) - 1])
+    assert not snippets.read_index(index_path, stat[6], int(stat[8]) & 0xFFFFFFFF)
+
+
+def test_macro_types_a_snippet(clock, tmp_path):
+    path, index_path = write_store(tmp_path)
+    snippets = Snippets(path, index_path, chunk_size=8)
+    pad = Pad(clock, {"keys": [
+        {"button": 0, "macro": [{"snippet": "signature"}, {"snippet": "missing"}, "!"]}
+    ]}, snippets)
+    pad.press(0)
+    pad.release(0, ms=500)
+    assert decode(pad.reports()) == "Best regards,\nThe macropad!"
@@ -0,0 +1,187 @@
+import math
+import os
+import shutil
+import struct
+import time
+
+import adafruit_bus_device.i2c_device as i2c_device
+import board
+import digitalio
+import usb_hid
+
+from adafruit_hid.consumer_control_code import ConsumerControlCode
+from macropad.boards.pico_rgb_keypad import PicoRGBKeypad
+from macropad.engine import Engine
+from macropad.events import Event
+
+BOARD = os.path.join(os.path.dirname(__file__), "..", "pico-rgb-keypad")
+CODE = os.path.join(BOARD, "code.py")
+
+# The line in code.py making the keypad, and the line swapped in to wire INT to GP3
+INTERRUPT_SETTING = ("pad = PicoRGBKeypad()", 'pad = PicoRGBKeypad(interrupt_pin="GP3")')
+INTERRUPT_PIN = "GP3"
+
+# Button 1 sends mute
+MUTE_BUTTON = 1
+MUTE_REPORT = struct.pack("<H", ConsumerControlCode.MUTE)
+
+
+# Raised by the virtual time.sleep() to stop code.py's loop once the simulation is over
+class Stop(Exception):
+    pass
+
+
+# Host simulation of a Pico RGB Keypad, runs code.py against the stubs on a virtual clock
+# that only moves on when code.py sleeps. Buttons change at the times given to run()
+# code.py runs in a copy of the board's folder, standing in for the CIRCUITPY drive
+class Simulator:
+    def __init__(self, monkeypatch, tmp_path, interrupt):
+        shutil.copytree(BOARD, tmp_path, dirs_exist_ok=True, ignore=shutil.ignore_patterns("*.cache"))
+        monkeypatch.chdir(tmp_path)
+        self.interrupt = interrupt
+        self.ns = 0
+        self.end = 0
+        self.presses = []
+        self.expander = None
+        monkeypatch.setattr(time, "monotonic", self.monotonic)
+        monkeypatch.setattr(time, "monotonic_ns", self.monotonic_ns)
+        monkeypatch.setattr(time, "sleep", self.sleep)
+        monkeypatch.setattr(i2c_device, "devices", [])
+        monkeypatch.setattr(digitalio, "pins", {})
+        for device in usb_hid.devices:
+            monkeypatch.setattr(device, "reports", [])
+
+    def monotonic(self):
+        return self.ns / 1e9
+
+    def monotonic_ns(self):
+        return self.ns
+
+    # Like the real thing, sleeps for at least as long as asked
+    def sleep(self, seconds):
+        self.ns += math.ceil(seconds * 1e9)
+        if self.expander is None and i2c_device.devices:
+            self.expander = i2c_device.devices[0]
+            if self.interrupt:
+                self.expander.interrupt = digitalio.pins[INTERRUPT_PIN]
+        while self.presses and self.presses[0][0] * 1e9 <= self.ns:
+            at, pressed, missed = self.presses.pop(0)
+            self.expander.press(pressed, missed)
+        if self.ns >= self.end:
+            raise Stop
+
+    # Function to run code.py for a number of seconds
+    # presses is a list of (seconds, pressed, missed) for press() on the expander
+    def run(self, seconds, presses=()):
+        with open(CODE) as file:
+            source = file.read()
+        if self.interrupt:
+            assert INTERRUPT_SETTING[0] in source
+            source = source.replace(*INTERRUPT_SETTING)
+        self.presses = sorted(presses)
+        self.end = int(seconds * 1e9)
+        try:
+            exec(compile(source, CODE, "exec"), {"__name__": "__main__"})
+        except Stop:
+            pass
+        return self.expander
+
+
+# Function to get the times mute was sent at
+def mute_times():
+    consumer = usb_hid.devices[2]
+    return [at for at, report in consumer.reports if report == MUTE_REPORT]
+
+
+# Function to make a keypad and engine, with the expander's INT wired to a pin if interrupt
+def make_pad(interrupt):
+    pad = PicoRGBKeypad(interrupt_pin=board.GP3 if interrupt else None)
+    pad.device.interrupt = pad.interrupt
+    engine = Engine(pad)
+    return pad, engine
+
+
+# Function to take the oldest event the engine has queued
+def next_event(engine):
+    event = Event()
+    assert engine.events.get_into(event)
+    return event
+
+
+# Function to scan every millisecond for a number of milliseconds
+def scan(engine, clock, ms):
+    for i in range(ms):
+        clock.advance(1)
+        engine.scan_buttons()
+
+
+def test_reads_every_loop_without_interrupt(monkeypatch, tmp_path):
+    expander = Simulator(monkeypatch, tmp_path, False).run(10)
+    assert expander.reads > 100
+
+
+def test_idle_pad_only_reads_for_the_fallback(monkeypatch, tmp_path):
+    expander = Simulator(monkeypatch, tmp_path, True).run(10)
+    assert 8 <= expander.reads <= 11
+
+
+def test_interrupt_triggers_a_read(monkeypatch, tmp_path):
+    presses = [(5, 1 << MUTE_BUTTON, False), (5.5, 0, False)]
+    expander = Simulator(monkeypatch, tmp_path, True).run(10, presses)
+    times = mute_times()
+    assert len(times) == 1
+    assert 5 <= times[0] < 5.05
+    # One read for the press and one for the release on top of the fallback
+    assert expander.reads <= 13
+
+
+def test_missed_interrupt_is_caught_by_the_fallback(monkeypatch, tmp_path):
+    presses = [(5, 1 << MUTE_BUTTON, True), (7, 0, False)]
+    Simulator(monkeypatch, tmp_path, True).run(10, presses)
+    times = mute_times()
+    assert len(times) == 1
+    assert 5 <= times[0] < 6.1
+
+
+def test_reads_every_scan_without_interrupt(clock):
+    pad, engine = make_pad(False)
+    scan(engine, clock, 100)
+    assert pad.device.reads == 100
+
+
+def test_idle_pad_only_reads_for_the_fallback_across_wrap(clock):
+    pad, engine = make_pad(True)
+    # The first scan reads straight away
+    scan(engine, clock, 1)
+    assert pad.device.reads == 1
+    scan(engine, clock, 10000)
+    assert pad.device.reads == 1 + 10000 // (pad.interrupt_fallback + 1)
+
+
+def test_interrupt_triggers_a_read_across_wrap(clock):
+    pad, engine = make_pad(True)
+    scan(engine, clock, 10)
+    reads = pad.device.reads
+
+    pad.device.press(1 << 5)
+    scan(engine, clock, 1)
+    assert pad.device.reads == reads + 1
+    assert pad.interrupt.value
+    assert next_event(engine).button == 5
+
+    # Nothing more is read while the button is held
+    scan(engine, clock, 100)
+    assert pad.device.reads == reads + 1
+
+    pad.device.press(0)
+    scan(engine, clock, 10)
+    assert pad.device.reads == reads + 2
+    assert not next_event(engine).pressed
+
+
+def test_missed_interrupt_is_caught_by_the_fallback_across_wrap(clock):
+    pad, engine = make_pad(True)
+    scan(engine, clock, 10)
+    pad.device.press(1 << 2, missed=True)
+    scan(engine, clock, pad.interrupt_fallback + 1)
+    assert next_event(engine).button == 2
@@ -0,0 +1,143 @@
+import pytest
+
+import macropad.engine
+from macropad.engine import Engine, PRESSED
+from macropad.ticks import TICKS_PERIOD, TICKS_MAX, ticks_add, ticks_diff, ticks_less
+from macropad.timers import Timers
+
+DAY = 24 * 60 * 60 * 1000
+
+
+# Board with buttons a test presses by setting pressed, bit n is button n
+class FakeBoard:
+    button_count = 4
+
+    def __init__(self):
+        self.pressed = 0
+
+    def button_states(self):
+        return self.pressed
+
+    def button_changed(self):
+        return True
+
+    def set_pixel(self, button, colour):
+        pass
+
+    def clear_pixel(self, button):
+        pass
+
+
+class Stop(Exception):
+    pass
+
+
+def test_ticks_diff_across_wrap():
+    assert ticks_add(TICKS_MAX, 1) == 0
+    assert ticks_add(5, -10) == TICKS_PERIOD - 5
+    assert ticks_diff(5, TICKS_MAX) == 6
+    assert ticks_diff(TICKS_MAX, 5) == -6
+    assert ticks_less(TICKS_MAX, 5)
+    assert not ticks_less(5, TICKS_MAX)
+
+
+def test_timer_fires_across_wrap(clock):
+    timers = Timers()
+    calls = []
+    timers.call_later(1500, calls.append, "once")
+    clock.advance(1499)
+    timers.run()
+    assert calls == []
+    assert ticks_diff(timers.next_deadline(), clock.ticks_ms()) == 1
+    clock.advance(1)
+    timers.run()
+    assert calls == ["once"]
+    assert len(timers) == 0
+
+
+def test_repeating_timer_keeps_its_period_across_wrap(clock):
+    timers = Timers()
+    calls = []
+
+    def tick(arg):
+        calls.append(arg)
+        assert len(calls) <= 100, "Timer repeating without waiting"
+
+    timers.call_every(30, tick, "tick")
+    for ms in range(3000):
+        clock.advance(1)
+        timers.run()
+    assert len(calls) == 100
+
+
+def test_timers_ordered_across_wrap(clock):
+    timers = Timers()
+    calls = []
+    # Deadlines either side of the wrap, the later ones are smaller numbers
+    for delay in (1200, 800, 1600, 400):
+        timers.call_later(delay, calls.append, delay)
+    clock.advance(2000)
+    timers.run()
+    assert calls == [400, 800, 1200, 1600]
+
+
+def test_scan_interval_across_wrap(clock):
+    engine = Engine(FakeBoard())
+    assert engine.scan_interval(True) == engine.scan_fast
+    # Idle time is counted from a busy_time before the wrap
+    clock.advance(engine.scan_idle - 1)
+    assert engine.scan_interval(False) == engine.scan_fast
+    clock.advance(2)
+    assert engine.scan_interval(False) == engine.scan_slow
+    # and stays idle however long it is left
+    clock.advance(TICKS_PERIOD // 2 + 1)
+    assert engine.scan_interval(False) == engine.scan_slow
+    assert engine.scan_interval(True) == engine.scan_fast
+
+
+# Runs Engine.run() for three weeks of virtual uptime, passing ticks_ms() through its wrap
+# several times. The pad sits idle for over a day between presses, each press is held long
+# enough for two hold repeats, and the loop must never sleep longer than a slow scan
+def test_weeks_of_uptime(clock, monkeypatch):
+    board = FakeBoard()
+    engine = Engine(board)
+    presses = []
+    engine.on(2, PRESSED, presses.append)
+
+    # Press at 0 ms, release at 500 ms, then idle for 1.1 days, on a loop
+    start = clock.now
+    cycle = 500 + 1000 + int(1.1 * DAY)
+    cycles = 3 * 7 * DAY // cycle
+
+    # A loop that never sleeps would never move the clock on, so fail it instead of hanging
+    reads = [0]
+
+    def ticks_ms():
+        reads[0] += 1
+        assert reads[0] < 1000, "Engine.run() stopped sleeping"
+        return clock.ticks_ms()
+
+    def sleep(seconds):
+        assert 0 <= seconds <= engine.scan_slow / 1000
+        reads[0] = 0
+        clock.advance(max(1, round(seconds * 1000)))
+        elapsed = clock.now - start
+        if elapsed // cycle >= cycles:
+            raise Stop
+        at = elapsed % cycle
+        if at < 500:
+            board.pressed = 1 << 2
+        elif at < 1500:
+            board.pressed = 0
+        else:
+            # Skip the rest of the idle time, nothing can be due while idle
+            board.pressed = 0
+            clock.advance(cycle - at)
+
+    monkeypatch.setattr(macropad.engine, "ticks_ms", ticks_ms)
+    monkeypatch.setattr(macropad.engine.time, "sleep", sleep)
+    with pytest.raises(Stop):
+        engine.run(hold_buttons=(2,), hold_delay=200)
+
+    assert (clock.now - start) // TICKS_PERIOD >= 3
+    assert len(presses) == 3 * cycles